@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 import copy
+import json
+import os
+import threading
 import time  # Für AI-Denkpause und Performance-Messung (optional)
 
+import schach_engine
+
 # --- Konstanten und globale Spielzustandsvariablen ---
 BOARD_SIZE = 6
 SQUARE_SIZE = 80
@@ -12,6 +17,34 @@ STATUS_FONT = ("Arial", 14)
 AI_PLAYER_COLOR = "black"  # KI spielt Schwarz
 HUMAN_PLAYER_COLOR = "white"
 AI_SEARCH_DEPTH = 2  # Suchtiefe für Minimax (Anzahl Halbzüge)
+AI_BACKEND = "bitboard"  # "bitboard" (schach_engine) oder "liste" (board-Listen unten)
+# Zeitbudget pro KI-Zug in Millisekunden. None: feste Tiefe AI_SEARCH_DEPTH,
+# sonst iterative Vertiefung bis AI_MAX_SEARCH_DEPTH oder bis die Zeit abläuft.
+AI_TIME_BUDGET_MS = None
+AI_MAX_SEARCH_DEPTH = 20
+AI_POLL_INTERVAL_MS = 100  # Abfrageintervall der GUI, solange die KI rechnet
+AI_PROGRESS_SPINNER = "|/-\\"
+AI_QUIESCENCE = True  # Ruhesuche über Schlagzüge/Umwandlungen am Suchhorizont
+AI_MOBILITY = True  # Mobilität aus Angriffs-Bitboards in der Bewertung
+AI_PONDER = True  # nach dem KI-Zug auf die erwartete Antwort weitersuchen
+AI_PVS = True  # Negamax mit Nullfenstern und Aspirationsfenstern statt minimax
+AI_NULL_MOVE = True  # Nullzug-Pruning (nur mit AI_PVS)
+AI_LMR = True  # späte Züge reduziert suchen (nur mit AI_PVS)
+AI_WORKERS = 1  # >1: Wurzelzüge auf so viele Prozesse verteilen
+AI_TT_ENTRIES = 1 << 18  # Anzahl Einträge der Transpositionstabelle
+AI_TT_REPLACEMENT = "depth"  # "depth" (tiefere Einträge bleiben) oder "always"
+# Eröffnungsbuch (mit schach_buch.py gebaut); fehlt die Datei, wird gesucht
+AI_BOOK_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "grok_schach.buch"
+)
+# Endspieldatenbank (mit schach_endspiel.py gebaut); fehlt die Datei, wird gesucht
+AI_TABLEBASE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "grok_schach.tb"
+)
+# Je KI-Zug eine JSON-Zeile mit der Suchstatistik (None: nicht schreiben)
+AI_STATS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "grok_schach_stats.jsonl"
+)
 
 PIECES_UNICODE = {
     "wP": "♙",
@@ -39,6 +72,7 @@ PIECE_VALUES = {
 CHECKMATE_SCORE = 10000
 STALEMATE_SCORE = 0
 MOBILITY_WEIGHT = 0.1  # Kleiner Faktor für Mobilitätsbonus
+DRAW_NO_PROGRESS_MOVES = 50  # Züge je Seite ohne Bauern- oder Schlagzug bis Remis
 
 INITIAL_BOARD_SETUP = [
     [
@@ -63,6 +97,48 @@ INITIAL_BOARD_SETUP = [
     ],  # Weiße Figuren: Turm, Springer, Dame, König, Läufer, Turm
 ]
 
+# Rochadegeometrie der Variante: Königs-/Turmfelder vor und nach der Rochade,
+# Felder die leer sein müssen und Felder die nicht angegriffen sein dürfen
+CASTLING_GEOMETRY = {
+    "white_kingside": {
+        "king": (5, 3),
+        "king_to": (5, 5),
+        "rook": (5, 5),
+        "rook_to": (5, 4),
+        "empty": [(5, 4)],
+        "safe": [(5, 3), (5, 4), (5, 5)],
+    },
+    "white_queenside": {
+        "king": (5, 3),
+        "king_to": (5, 1),
+        "rook": (5, 0),
+        "rook_to": (5, 2),
+        "empty": [(5, 1), (5, 2)],
+        "safe": [(5, 3), (5, 2), (5, 1)],
+    },
+    "black_kingside": {
+        "king": (0, 3),
+        "king_to": (0, 5),
+        "rook": (0, 5),
+        "rook_to": (0, 4),
+        "empty": [(0, 4)],
+        "safe": [(0, 3), (0, 4), (0, 5)],
+    },
+    "black_queenside": {
+        "king": (0, 3),
+        "king_to": (0, 1),
+        "rook": (0, 0),
+        "rook_to": (0, 2),
+        "empty": [(0, 1), (0, 2)],
+        "safe": [(0, 3), (0, 2), (0, 1)],
+    },
+}
+
+VARIANT = schach_engine.Variant("grok_schach", INITIAL_BOARD_SETUP, CASTLING_GEOMETRY)
+ai_transposition_table = schach_engine.TranspositionTable(
+    AI_TT_ENTRIES, AI_TT_REPLACEMENT
+)
+
 # Globale Variablen für den aktuellen Spielzustand
 board = []
 current_player = HUMAN_PLAYER_COLOR  # Mensch beginnt
@@ -73,6 +149,12 @@ game_over = False
 selected_piece_pos = None
 highlighted_square_ids = []
 possible_move_dots = []
+# Legale Züge der Seite am Zug, nach Startfeld; None = nach dem letzten Zug ungültig
+legal_moves_by_origin = None
+# Zobrist-Schlüssel aller Stellungen der Partie (die aktuelle zuletzt) und
+# Halbzüge seit dem letzten Bauern- oder Schlagzug, für die Remisregeln
+position_keys = []
+halfmove_clock = 0
 
 
 # --- Hilfsfunktionen für Figuren und Brett ---
@@ -384,45 +466,40 @@ def _is_square_attacked_from_state(
     current_en_passant_target,
     relevant_castling_rights,
 ):
-    for R_attacker in range(BOARD_SIZE):
-        for C_attacker in range(BOARD_SIZE):
-            piece_attacker = current_board[R_attacker][C_attacker]
-            if piece_attacker and get_piece_color(piece_attacker) == attacker_color:
-                p_type_attacker = get_piece_type(piece_attacker)
-                if p_type_attacker == "P":
-                    direction_attacker = -1 if attacker_color == "white" else 1
-                    for dc_capture_attacker in [-1, 1]:
-                        if (
-                            R_attacker + direction_attacker == r_attacked
-                            and C_attacker + dc_capture_attacker == c_attacked
-                        ):
-                            return True
-                elif p_type_attacker == "K":
-                    if (
-                        max(abs(R_attacker - r_attacked), abs(C_attacker - c_attacked))
-                        == 1
-                    ):
+    # Rückwärts vom Zielfeld über die vorberechneten Angriffstabellen:
+    # Springer-/Königsnachbarn, Bauernschlagfelder und Strahlen je Richtung.
+    prefix = "w" if attacker_color == "white" else "b"
+    sq_attacked = schach_engine.square_index(r_attacked, c_attacked)
+
+    for sq_attacker in schach_engine.KNIGHT_NEIGHBORS[sq_attacked]:
+        r_attacker, c_attacker = schach_engine.square_coords(sq_attacker)
+        if current_board[r_attacker][c_attacker] == prefix + "N":
+            return True
+    for sq_attacker in schach_engine.KING_NEIGHBORS[sq_attacked]:
+        r_attacker, c_attacker = schach_engine.square_coords(sq_attacker)
+        if current_board[r_attacker][c_attacker] == prefix + "K":
+            return True
+
+    # Ein angreifender Bauer steht eine Reihe "hinter" dem Zielfeld
+    r_pawn = r_attacked + (1 if attacker_color == "white" else -1)
+    for c_pawn in (c_attacked - 1, c_attacked + 1):
+        if is_valid_square(r_pawn, c_pawn) and current_board[r_pawn][c_pawn] == (
+            prefix + "P"
+        ):
+            return True
+
+    for rays, slider_types in (
+        (schach_engine.ROOK_RAYS[sq_attacked], (prefix + "R", prefix + "Q")),
+        (schach_engine.BISHOP_RAYS[sq_attacked], (prefix + "B", prefix + "Q")),
+    ):
+        for ray in rays:
+            for sq_attacker in ray:
+                r_attacker, c_attacker = schach_engine.square_coords(sq_attacker)
+                piece_on_ray = current_board[r_attacker][c_attacker]
+                if piece_on_ray:
+                    if piece_on_ray in slider_types:
                         return True
-                else:  # R, N, B, Q
-                    pseudo_moves_attacker = _get_all_pseudo_legal_moves_for_piece(
-                        R_attacker,
-                        C_attacker,
-                        piece_attacker,
-                        current_board,
-                        current_en_passant_target,
-                        {},
-                        current_king_positions,
-                    )
-                    for move_attacker in pseudo_moves_attacker:
-                        if (
-                            move_attacker[0] == r_attacked
-                            and move_attacker[1] == c_attacked
-                        ):
-                            if len(move_attacker) == 3 and move_attacker[2].startswith(
-                                "O-O"
-                            ):
-                                continue
-                            return True
+                    break
     return False
 
 
@@ -502,6 +579,16 @@ def get_all_legal_moves_for_player(player_color_moving):
     )
 
 
+def get_legal_moves_by_origin():
+    # Einmal je Stellung berechnet, make_move und initialize_game_state verwerfen ihn
+    global legal_moves_by_origin
+    if legal_moves_by_origin is None:
+        legal_moves_by_origin = {}
+        for start_pos, end_move_tuple in get_all_legal_moves_for_player(current_player):
+            legal_moves_by_origin.setdefault(start_pos, []).append(end_move_tuple)
+    return legal_moves_by_origin
+
+
 def is_in_check(player_color_in_check):
     return _is_in_check_from_state(
         player_color_in_check, board, king_positions, en_passant_target, castling_rights
@@ -590,6 +677,7 @@ def _simulate_move_on_state(
 
 def initialize_game_state():
     global board, current_player, king_positions, castling_rights, en_passant_target, game_over
+    global legal_moves_by_origin, position_keys, halfmove_clock
     board = copy.deepcopy(INITIAL_BOARD_SETUP)
     current_player = HUMAN_PLAYER_COLOR
     king_positions = {"white": (5, 3), "black": (0, 3)}  # Neue Königspositionen
@@ -601,11 +689,22 @@ def initialize_game_state():
     }
     en_passant_target = None
     game_over = False
+    legal_moves_by_origin = None
+    halfmove_clock = 0
+    position_keys = [game_position(current_player).key]
+    ai_transposition_table.clear()
 
 
 def make_move(start_pos_make, end_move_tuple_make, promotion_piece_type_make=None):
     global board, current_player, king_positions, castling_rights, en_passant_target
+    global legal_moves_by_origin, position_keys, halfmove_clock
 
+    start_r, start_c = start_pos_make
+    # Rochade landet auf dem Feld des eigenen Turms, ist aber kein Schlagzug
+    irreversible = get_piece_type(board[start_r][start_c]) == "P" or (
+        len(end_move_tuple_make) < 3
+        and board[end_move_tuple_make[0]][end_move_tuple_make[1]] is not None
+    )
     new_board, new_king_pos, new_ep_target, new_castling_rights = (
         _simulate_move_on_state(
             board,
@@ -623,17 +722,18 @@ def make_move(start_pos_make, end_move_tuple_make, promotion_piece_type_make=Non
     king_positions = new_king_pos
     en_passant_target = new_ep_target
     castling_rights = new_castling_rights
+    legal_moves_by_origin = None
 
     current_player = (
         AI_PLAYER_COLOR if current_player == HUMAN_PLAYER_COLOR else HUMAN_PLAYER_COLOR
     )
+    halfmove_clock = 0 if irreversible else halfmove_clock + 1
+    position_keys.append(game_position(current_player).key)
 
 
 def check_game_status():
     global game_over
-    legal_moves_for_current = get_all_legal_moves_for_player(current_player)
-
-    if not legal_moves_for_current:
+    if not get_legal_moves_by_origin():
         opponent = (
             HUMAN_PLAYER_COLOR if current_player == AI_PLAYER_COLOR else AI_PLAYER_COLOR
         )
@@ -646,7 +746,18 @@ def check_game_status():
             messagebox.showinfo("Spielende", "Patt! Unentschieden.")
             game_over = True
         return True
-    elif is_in_check(current_player):
+    if halfmove_clock >= 2 * DRAW_NO_PROGRESS_MOVES:
+        messagebox.showinfo(
+            "Spielende",
+            f"Remis: {DRAW_NO_PROGRESS_MOVES} Züge ohne Bauernzug oder Schlagen.",
+        )
+        game_over = True
+        return True
+    if position_keys.count(position_keys[-1]) >= 3:
+        messagebox.showinfo("Spielende", "Remis durch dreifache Stellungswiederholung.")
+        game_over = True
+        return True
+    if is_in_check(current_player):
         if gui:
             gui.update_status_label(f"{current_player.capitalize()} ist im Schach!")
     return False
@@ -671,6 +782,27 @@ def evaluate_board_state(
     return score
 
 
+def _tablebase_score_from_state(
+    t_board, t_ep_target, t_castling_rights, player_turn_on_this_board
+):
+    # Gelöstes Endspiel (drei Steine) aus Sicht der KI, sonst None
+    tablebase = get_tablebase()
+    if tablebase is None or sum(1 for row in t_board for piece in row if piece) != 3:
+        return None
+    score = tablebase.probe(
+        schach_engine.Position.from_state(
+            VARIANT,
+            t_board,
+            t_ep_target,
+            t_castling_rights,
+            player_turn_on_this_board,
+        )
+    )
+    if score is None or player_turn_on_this_board == AI_PLAYER_COLOR:
+        return score
+    return -score
+
+
 def _minimax_recursive(
     m_board,
     m_king_pos,
@@ -681,7 +813,13 @@ def _minimax_recursive(
     alpha,
     beta,
     maximizing_player,
+    stop_event=None,
 ):
+    # stop_event (threading.Event) bricht die Suche mit SearchTimeout ab
+    if stop_event is not None and stop_event.is_set():
+        raise schach_engine.SearchTimeout()
+    global list_search_nodes
+    list_search_nodes += 1
     possible_moves = _get_all_legal_moves_from_state(
         m_player_turn, m_board, m_king_pos, m_ep_target, m_castling_rights
     )
@@ -696,6 +834,11 @@ def _minimax_recursive(
                 ), None
             else:
                 return STALEMATE_SCORE, None
+        tablebase_score = _tablebase_score_from_state(
+            m_board, m_ep_target, m_castling_rights, m_player_turn
+        )
+        if tablebase_score is not None:
+            return tablebase_score, None
         base_eval_score = evaluate_board_state(
             m_board, m_king_pos, m_ep_target, m_castling_rights, m_player_turn
         )
@@ -729,6 +872,7 @@ def _minimax_recursive(
                 alpha,
                 beta,
                 False,
+                stop_event,
             )
 
             if eval_score > max_eval:
@@ -761,6 +905,7 @@ def _minimax_recursive(
                 alpha,
                 beta,
                 True,
+                stop_event,
             )
 
             if eval_score < min_eval:
@@ -772,19 +917,198 @@ def _minimax_recursive(
         return min_eval, best_move_at_this_depth
 
 
-def find_best_move_ai():
-    score, best_move = _minimax_recursive(
-        copy.deepcopy(board),
-        copy.deepcopy(king_positions),
+def game_position(side_to_move):
+    return schach_engine.Position.from_state(
+        VARIANT,
+        board,
         en_passant_target,
-        copy.deepcopy(castling_rights),
-        AI_PLAYER_COLOR,
-        AI_SEARCH_DEPTH,
-        -float("inf"),
-        float("inf"),
-        True,
+        castling_rights,
+        side_to_move,
+        position_keys[:-1],
+        halfmove_clock,
     )
-    return best_move
+
+
+def current_ai_position():
+    return game_position(AI_PLAYER_COLOR)
+
+
+def ai_search_options():
+    # Schlüsselwortargumente für Search, gleich für die Suche im GUI-Prozess und
+    # die parallele Wurzelsuche
+    return {
+        "quiescence": AI_QUIESCENCE,
+        "mobility": AI_MOBILITY,
+        "mobility_weight": MOBILITY_WEIGHT,
+        "pvs": AI_PVS,
+        "null_move": AI_NULL_MOVE,
+        "lmr": AI_LMR,
+        "no_progress_plies": 2 * DRAW_NO_PROGRESS_MOVES,
+        "tablebase": get_tablebase(),
+    }
+
+
+def create_ai_search(stop_event=None):
+    ai_transposition_table.new_search()
+    return schach_engine.Search(
+        schach_engine.COLOR_NAMES.index(AI_PLAYER_COLOR),
+        ai_transposition_table,
+        stop_event=stop_event,
+        **ai_search_options(),
+    )
+
+
+_parallel_search = None
+_opening_book = None
+_tablebase = None
+last_search_stats = None  # SearchStats der letzten KI-Suche, None bei Buchzügen
+list_search_nodes = 0  # Knotenzähler des Listen-Backends
+
+
+def get_parallel_search():
+    # Der Prozesspool wird beim ersten Bedarf gestartet und dann wiederverwendet
+    global _parallel_search
+    if _parallel_search is None:
+        _parallel_search = schach_engine.ParallelSearch(AI_WORKERS)
+    return _parallel_search
+
+
+def find_expected_reply():
+    # Erwartete Antwort des Menschen = Hashzug der Stellung nach dem KI-Zug.
+    # Ergebnis: (Start, Ziel, Umwandlung) und die Stellung danach, oder (None, None)
+    position = game_position(HUMAN_PLAYER_COLOR)
+    entry = ai_transposition_table.probe(position.key)
+    if entry is None or entry[4] not in position.generate_legal_moves():
+        return None, None
+    reply = entry[4]
+    start_pos, end_tuple = schach_engine.move_to_tuple(position, reply)
+    promotion = None
+    if schach_engine.move_flag(reply) == schach_engine.MOVE_PROMOTION:
+        promotion = "Q"
+    position.make_move(reply)
+    return (start_pos, end_tuple, promotion), position
+
+
+def get_opening_book():
+    # Wird beim ersten Bedarf geladen; ohne Buchdatei ein leeres Buch
+    global _opening_book
+    if _opening_book is None:
+        _opening_book = schach_engine.OpeningBook()
+        if AI_BOOK_PATH and os.path.exists(AI_BOOK_PATH):
+            try:
+                _opening_book = schach_engine.OpeningBook.load(AI_BOOK_PATH)
+            except (OSError, ValueError) as error:
+                print(f"Eröffnungsbuch nicht geladen: {error}")
+    return _opening_book
+
+
+def find_book_move(position=None):
+    if position is None:
+        position = current_ai_position()
+    book_move = get_opening_book().probe(position)
+    if book_move is None:
+        return None
+    return schach_engine.move_to_tuple(position, book_move)
+
+
+def get_tablebase():
+    # Wird beim ersten Bedarf per mmap eingeblendet; ohne Datei None
+    global _tablebase
+    if _tablebase is None:
+        _tablebase = False  # nur ein Ladeversuch
+        if AI_TABLEBASE_PATH and os.path.exists(AI_TABLEBASE_PATH):
+            try:
+                _tablebase = schach_engine.Tablebase(AI_TABLEBASE_PATH)
+            except (OSError, ValueError) as error:
+                print(f"Endspieldatenbank nicht geladen: {error}")
+    return _tablebase or None
+
+
+def find_tablebase_move(position=None):
+    tablebase = get_tablebase()
+    if tablebase is None:
+        return None
+    if position is None:
+        position = current_ai_position()
+    tablebase_move = tablebase.best_move(position)
+    if tablebase_move is None:
+        return None
+    return schach_engine.move_to_tuple(position, tablebase_move)
+
+
+def _find_best_move_bitboard(position=None, search=None, ponder=False):
+    # Liefert (Zug, SearchStats); die Statistik ist None bei Buch- und
+    # Tabellenzügen und bei abgebrochener Suche
+    if position is None:
+        position = current_ai_position()
+    if not ponder:
+        book_move = find_book_move(position) or find_tablebase_move(position)
+        if book_move is not None:
+            return book_move, None
+    if search is None:
+        search = create_ai_search()
+    try:
+        if ponder:
+            score, best_move = search.iterative_deepening(
+                position, AI_MAX_SEARCH_DEPTH, ponder=True
+            )
+        elif AI_WORKERS > 1:
+            parallel = get_parallel_search()
+            score, best_move = parallel.search(
+                position,
+                AI_SEARCH_DEPTH if AI_TIME_BUDGET_MS is None else AI_MAX_SEARCH_DEPTH,
+                AI_TIME_BUDGET_MS,
+                stop=search.stop_event,
+                **ai_search_options(),
+            )
+            search.stats.finish_parallel(parallel)
+        elif AI_TIME_BUDGET_MS is None:
+            score, best_move = search.search_depth(position, AI_SEARCH_DEPTH)
+            search.stats.finish(search)  # iterative_deepening macht das selbst
+        else:
+            score, best_move = search.iterative_deepening(
+                position, AI_MAX_SEARCH_DEPTH, AI_TIME_BUDGET_MS
+            )
+    except schach_engine.SearchTimeout:  # über stop_event abgebrochen
+        return None, None
+    if best_move is None:
+        return None, search.stats
+    return schach_engine.move_to_tuple(position, best_move), search.stats
+
+
+def _find_best_move_list(stop_event=None):
+    # Wie _find_best_move_bitboard: (Zug, SearchStats oder None)
+    global list_search_nodes
+    book_move = find_book_move() or find_tablebase_move()
+    if book_move is not None:
+        return book_move, None
+    stats = schach_engine.SearchStats()
+    list_search_nodes = 0
+    try:
+        score, best_move = _minimax_recursive(
+            copy.deepcopy(board),
+            copy.deepcopy(king_positions),
+            en_passant_target,
+            copy.deepcopy(castling_rights),
+            AI_PLAYER_COLOR,
+            AI_SEARCH_DEPTH,
+            -float("inf"),
+            float("inf"),
+            True,
+            stop_event,
+        )
+    except schach_engine.SearchTimeout:  # über stop_event abgebrochen
+        return None, None
+    stats.nodes = list_search_nodes
+    stats.seconds = time.perf_counter() - stats.start_time
+    stats.depth = AI_SEARCH_DEPTH
+    return best_move, stats
+
+
+def find_best_move_ai(stop_event=None):
+    if AI_BACKEND == "bitboard":
+        return _find_best_move_bitboard()[0]
+    return _find_best_move_list(stop_event)[0]
 
 
 # --- GUI Klasse ---
@@ -805,10 +1129,20 @@ class ChessGUI:
             root_window, text="Neues Spiel", command=self.reset_game_ui
         )
         reset_button.pack(pady=5)
+        stats_button = tk.Button(
+            root_window, text="Suchstatistik", command=self.toggle_search_stats
+        )
+        stats_button.pack(pady=5)
+        self.show_search_stats = False  # Statistik nach jedem KI-Zug im Statuslabel
+        self.ai_job = None  # laufende KI-Suche im Hintergrund-Thread
+        self.ponder_job = (
+            None  # Suche auf die erwartete Antwort, während der Mensch denkt
+        )
         self.reset_game_ui()
 
     def reset_game_ui(self):
         global selected_piece_pos, possible_move_dots, highlighted_square_ids, current_player, game_over
+        self.cancel_ai_search()
         initialize_game_state()
         selected_piece_pos = None
         self.clear_highlights()
@@ -909,11 +1243,9 @@ class ChessGUI:
 
         if selected_piece_pos:
             start_r_click, start_c_click = selected_piece_pos
-            potential_moves_for_selected_click = []
-            all_player_moves_click = get_all_legal_moves_for_player(current_player)
-            for move_pair_click in all_player_moves_click:
-                if move_pair_click[0] == selected_piece_pos:
-                    potential_moves_for_selected_click.append(move_pair_click[1])
+            potential_moves_for_selected_click = get_legal_moves_by_origin().get(
+                selected_piece_pos, []
+            )
 
             target_move_tuple_click = None
             for move_tuple_click_item in potential_moves_for_selected_click:
@@ -950,11 +1282,9 @@ class ChessGUI:
             self.show_legal_moves_for_selected_piece(r_click, c_click)
 
     def show_legal_moves_for_selected_piece(self, r_selected_show, c_selected_show):
-        legal_moves_for_this_piece_show = []
-        all_player_moves_show = get_all_legal_moves_for_player(current_player)
-        for move_pair_show in all_player_moves_show:
-            if move_pair_show[0] == (r_selected_show, c_selected_show):
-                legal_moves_for_this_piece_show.append(move_pair_show[1])
+        legal_moves_for_this_piece_show = get_legal_moves_by_origin().get(
+            (r_selected_show, c_selected_show), []
+        )
         self.show_possible_moves(legal_moves_for_this_piece_show)
 
     def handle_human_move(self, start_pos_handle, end_move_tuple_handle):
@@ -974,14 +1304,24 @@ class ChessGUI:
         make_move(
             start_pos_handle, end_move_tuple_handle, promotion_piece_choice_handle
         )
+        self.resolve_ponder(
+            (
+                start_pos_handle,
+                tuple(end_move_tuple_handle),
+                promotion_piece_choice_handle,
+            )
+        )
         self.draw_board()
         self.draw_pieces()
 
         if not game_over:
             is_game_now_over = check_game_status()
-            if not is_game_now_over:
-                if current_player == AI_PLAYER_COLOR:
-                    self.trigger_ai_turn()
+            if is_game_now_over:
+                # Erwarteter Zug beendet die Partie (z.B. Wiederholung): nicht
+                # weiter auf einen KI-Zug vorausrechnen, der nie kommt
+                self.cancel_pondering()
+            elif current_player == AI_PLAYER_COLOR:
+                self.trigger_ai_turn()
 
     def trigger_ai_turn(self):
         if game_over or current_player != AI_PLAYER_COLOR:
@@ -991,11 +1331,130 @@ class ChessGUI:
         self.root.after(50, self.execute_ai_move)
 
     def execute_ai_move(self):
-        global game_over, current_player
         if game_over or current_player != AI_PLAYER_COLOR:
             return
+        if self.ponder_job is not None:
+            # Ponder-Treffer: die laufende Suche wird übernommen, Zeitbudget bzw.
+            # Suchtiefe gelten ab jetzt
+            job = self.ponder_job
+            self.ponder_job = None
+            job["search"].ponder_hit(
+                AI_TIME_BUDGET_MS,
+                AI_SEARCH_DEPTH if AI_TIME_BUDGET_MS is None else None,
+            )
+            job["ticks"] = 0
+            self.ai_job = job
+            self.root.after(AI_POLL_INTERVAL_MS, self.poll_ai_search, job)
+            return
+        # Die Suche läuft in einem Hintergrund-Thread; Tk wird nur aus dem
+        # Hauptthread angefasst, der das Ergebnis per after() abfragt.
+        job = {
+            "stop_event": threading.Event(),
+            "search": None,
+            "result": None,
+            "stats": None,
+            "ticks": 0,
+        }
+        position = None
+        if AI_BACKEND == "bitboard":
+            position = current_ai_position()
+            job["search"] = create_ai_search(job["stop_event"])
+        job["thread"] = threading.Thread(
+            target=self._run_ai_job, args=(job, position), daemon=True
+        )
+        self.ai_job = job
+        job["thread"].start()
+        self.root.after(AI_POLL_INTERVAL_MS, self.poll_ai_search, job)
+
+    def _run_ai_job(self, job, position, ponder=False):
+        # Läuft im Such-Thread: die Statistik bleibt am Job, bis poll_ai_search
+        # den Zug im Hauptthread ausführt
+        if job["search"] is not None:
+            job["result"], job["stats"] = _find_best_move_bitboard(
+                position, job["search"], ponder
+            )
+        else:
+            job["result"], job["stats"] = _find_best_move_list(job["stop_event"])
 
-        ai_move = find_best_move_ai()
+    def cancel_ai_search(self):
+        if self.ai_job is not None:
+            self.ai_job["stop_event"].set()
+            self.ai_job = None
+        self.cancel_pondering()
+
+    def start_pondering(self):
+        if not AI_PONDER or AI_BACKEND != "bitboard" or AI_WORKERS > 1:
+            return
+        if game_over or current_player != HUMAN_PLAYER_COLOR:
+            return
+        expected_move, position = find_expected_reply()
+        if expected_move is None:
+            return
+        job = {
+            "stop_event": threading.Event(),
+            "search": None,
+            "result": None,
+            "stats": None,
+            "ticks": 0,
+            "expected_move": expected_move,
+        }
+        job["search"] = create_ai_search(job["stop_event"])
+        job["thread"] = threading.Thread(
+            target=self._run_ai_job, args=(job, position, True), daemon=True
+        )
+        self.ponder_job = job
+        job["thread"].start()
+
+    def resolve_ponder(self, human_move):
+        # Treffer: die Ponder-Suche läuft weiter und execute_ai_move übernimmt sie
+        if self.ponder_job is not None:
+            if self.ponder_job["expected_move"] != human_move:
+                self.cancel_pondering()
+
+    def cancel_pondering(self):
+        # Fehlschlag: abbrechen und auf den Thread warten, damit er nicht mit der
+        # nächsten Suche um die Transpositionstabelle konkurriert
+        job = self.ponder_job
+        if job is not None:
+            self.ponder_job = None
+            job["stop_event"].set()
+            job["thread"].join()
+
+    def poll_ai_search(self, job):
+        global last_search_stats
+        if job is not self.ai_job:  # inzwischen abgebrochen
+            return
+        if job["thread"].is_alive():
+            job["ticks"] += 1
+            self.update_status_label(self.ai_progress_text(job))
+            self.root.after(AI_POLL_INTERVAL_MS, self.poll_ai_search, job)
+            return
+        self.ai_job = None
+        last_search_stats = job["stats"]
+        self.apply_ai_move(job["result"])
+        self.start_pondering()
+
+    def ai_progress_text(self, job):
+        spinner = AI_PROGRESS_SPINNER[job["ticks"] % len(AI_PROGRESS_SPINNER)]
+        text = f"{AI_PLAYER_COLOR.capitalize()} (KI) denkt nach {spinner}"
+        search = job["search"]
+        if search is not None and AI_WORKERS > 1:
+            # Nur lesen: den Prozesspool startet allein der Such-Thread
+            if _parallel_search is not None:
+                text += (
+                    f"  Tiefe {_parallel_search.current_depth}, "
+                    f"{_parallel_search.shared_nodes.value} Knoten, "
+                    f"{AI_WORKERS} Prozesse"
+                )
+        elif search is not None:
+            depth = search.current_depth or AI_SEARCH_DEPTH
+            text += f"  Tiefe {depth}, {search.nodes + search.qnodes} Knoten"
+        return text
+
+    def apply_ai_move(self, ai_move):
+        global game_over, current_player
+        if game_over or current_player != AI_PLAYER_COLOR:
+            return
 
         if ai_move:
             start_pos_ai, end_tuple_ai = ai_move
@@ -1017,6 +1476,38 @@ class ChessGUI:
                         self.update_status_label(
                             f"{current_player.capitalize()} (Mensch) ist am Zug."
                         )
+            self.record_search_stats(ai_move)
+
+    def toggle_search_stats(self):
+        self.show_search_stats = not self.show_search_stats
+        if self.show_search_stats:
+            self.update_status_label(self.search_stats_text())
+
+    def search_stats_text(self):
+        if last_search_stats is None:
+            return "Keine Suchstatistik (noch kein KI-Zug oder Buch-/Tabellenzug)."
+        return "Letzte KI-Suche: " + last_search_stats.summary()
+
+    def record_search_stats(self, ai_move):
+        # Schreibt die Statistik des KI-Zugs als JSON-Zeile und zeigt sie auf Wunsch an
+        if AI_STATS_PATH:
+            record = {
+                "variant": VARIANT.name,
+                "ply": len(position_keys) - 1,
+                "color": AI_PLAYER_COLOR,
+                "backend": AI_BACKEND,
+                "move": ai_move,
+                "stats": last_search_stats.to_dict() if last_search_stats else None,
+            }
+            try:
+                with open(AI_STATS_PATH, "a", encoding="utf-8") as stats_file:
+                    stats_file.write(json.dumps(record) + "\n")
+            except OSError as error:
+                print(f"Suchstatistik nicht geschrieben: {error}")
+        if self.show_search_stats:
+            self.update_status_label(
+                self.status_label.cget("text") + "\n" + self.search_stats_text()
+            )
 
     def prompt_pawn_promotion(self):
         choice_promo = simpledialog.askstring(
@@ -0,0 +1,355 @@
+# --- Perft und Benchmarks für die 6x6-Schach-Engine (ohne GUI) ---
+#
+#   python schach_bench.py perft                       # Testsuite mit Referenzwerten
+#   python schach_bench.py perft --variant grok_schach --depth 4 --divide
+#   python schach_bench.py perft --fen "rnbkqr/pppppp/6/6/PPPPPP/RNBQKR w KQkq -" -d 3
+#   python schach_bench.py perft --backend liste -d 3    # Zuggenerator der GUI-Skripte
+#   python schach_bench.py parallel --workers 4 --depth 4
+#   python schach_bench.py vergleich --depth 5 --modes minimax,pvs
+#   python schach_bench.py vergleich --time 2000 --modes pvs,selektiv
+import argparse
+import os
+import sys
+import time
+
+import daschach
+import grok_schach
+import schach_engine
+
+VARIANTS = {
+    "daschach": daschach.VARIANT,
+    "grok_schach": grok_schach.VARIANT,
+}
+# Skripte mit dem Listen-Backend (_get_all_legal_moves_from_state)
+LIST_MODULES = {
+    "daschach": daschach,
+    "grok_schach": grok_schach,
+}
+PERFT_BACKENDS = ("bitboard", "liste")
+
+# Referenzwerte je Variante: (Name, FEN oder None = Startstellung, {Tiefe: Blätter}).
+# Ermittelt mit dem ursprünglichen Listen-Backend (_get_all_legal_moves_from_state
+# und _simulate_move_on_state, Umwandlung immer in eine Dame).
+PERFT_SUITE = {
+    "daschach": [
+        ("start", None, {1: 15, 2: 200, 3: 3196, 4: 44952, 5: 749255}),
+        (
+            "rochade-ep-umwandlung",
+            "r1bk1r/p4p/1Ppq2/P1P3/p2PPp/2BQRK b kq b3",
+            {1: 28, 2: 297, 3: 7530, 4: 99163},
+        ),
+        (
+            "schach-ep",
+            "r1bkqQ/1p2n1/pPP1pp/P2pPP/2P1K1/RNB2R w k d4",
+            {1: 6, 2: 64, 3: 1097, 4: 11288},
+        ),
+        (
+            "rochade-umwandlung",
+            "rnbk1r/pppq1p/P1P1p1/R2P1P/1P2p1/1NB1KR b Kkq -",
+            {1: 20, 2: 385, 3: 7339, 4: 131125},
+        ),
+    ],
+    "grok_schach": [
+        ("start", None, {1: 14, 2: 186, 3: 2845, 4: 39923}),
+        (
+            "rochade-ep-umwandlung",
+            "r1qk1r/p1pp1b/nPpP2/3Q1p/P3Pp/RN1KBR b KQkq b3",
+            {1: 20, 2: 436, 3: 7818, 4: 155731},
+        ),
+        (
+            "schach-ep",
+            "1n2br/1pqpkP/r1pP2/p5/PPP3/RNQKBR b KQ d3",
+            {1: 5, 2: 91, 3: 1234, 4: 24403},
+        ),
+        (
+            "schach-umwandlung",
+            "3kbr/1p3p/4P1/r3n1/PBp2q/R1KR2 b k -",
+            {1: 8, 2: 84, 3: 1868, 4: 24038},
+        ),
+    ],
+}
+
+
+# Suchvarianten für den Knotenvergleich: Name -> Schlüsselwortargumente für Search
+SEARCH_MODES = {
+    "minimax": {"pvs": False},
+    "pvs": {"pvs": True},
+    "nullzug": {"pvs": True, "null_move": True},
+    "lmr": {"pvs": True, "lmr": True},
+    "selektiv": {"pvs": True, "null_move": True, "lmr": True},
+    "ohne_see": {"pvs": True, "null_move": True, "lmr": True, "see": False},
+}
+
+
+def suite_position(variant_name, fen):
+    variant = VARIANTS[variant_name]
+    if fen is None:
+        return variant.initial_position()
+    return schach_engine.position_from_fen(variant, fen)
+
+
+def _format_rate(nodes, seconds):
+    return f"{nodes / seconds:,.0f} Knoten/s" if seconds > 0 else "-"
+
+
+def list_perft(module, state, color, depth):
+    # Wie schach_engine.perft, aber mit Zuggenerator und Zugausführung des
+    # Listen-Backends; state ist (Brett, Königsfelder, En-passant-Feld, Rochaderechte)
+    if depth == 0:
+        return 1
+    board, king_positions, ep_target, castling_rights = state
+    moves = module._get_all_legal_moves_from_state(
+        color, board, king_positions, ep_target, castling_rights
+    )
+    if depth == 1:
+        return len(moves)
+    opponent = "black" if color == "white" else "white"
+    nodes = 0
+    for start_pos, end_tuple in moves:
+        next_state = module._simulate_move_on_state(
+            board,
+            king_positions,
+            ep_target,
+            castling_rights,
+            color,
+            start_pos,
+            end_tuple,
+        )
+        nodes += list_perft(module, next_state, opponent, depth - 1)
+    return nodes
+
+
+def list_perft_divide(module, pos, depth):
+    # Knotenzahl je Wurzelzug über das Listen-Backend, Züge wie bei perft_divide
+    board, king_positions, ep_target, castling_rights = pos.to_state()
+    color = schach_engine.COLOR_NAMES[pos.side]
+    opponent = "black" if color == "white" else "white"
+    counts = []
+    for start_pos, end_tuple in module._get_all_legal_moves_from_state(
+        color, board, king_positions, ep_target, castling_rights
+    ):
+        next_state = module._simulate_move_on_state(
+            board,
+            king_positions,
+            ep_target,
+            castling_rights,
+            color,
+            start_pos,
+            end_tuple,
+        )
+        move = schach_engine.tuple_to_move(pos, start_pos, end_tuple)
+        counts.append((move, list_perft(module, next_state, opponent, depth - 1)))
+    return counts
+
+
+def count_perft(variant_name, pos, depth, backend="bitboard"):
+    if backend == "bitboard":
+        return schach_engine.perft(pos, depth)
+    return list_perft(
+        LIST_MODULES[variant_name],
+        pos.to_state(),
+        schach_engine.COLOR_NAMES[pos.side],
+        depth,
+    )
+
+
+def run_perft(variant_name, pos, depth, divide=False, backend="bitboard"):
+    start = time.perf_counter()
+    if divide:
+        if backend == "bitboard":
+            counts = schach_engine.perft_divide(pos, depth)
+        else:
+            counts = list_perft_divide(LIST_MODULES[variant_name], pos, depth)
+        nodes = 0
+        for move, count in counts:
+            print(f"{schach_engine.move_to_text(move)}: {count}")
+            nodes += count
+    else:
+        nodes = count_perft(variant_name, pos, depth, backend)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Tiefe {depth}: {nodes} Knoten in {elapsed:.2f}s "
+        f"({_format_rate(nodes, elapsed)})"
+    )
+    return nodes
+
+
+def run_perft_suite(variant_names, max_depth, backend="bitboard"):
+    # Prüft alle gespeicherten Stellungen bis max_depth gegen die Referenzwerte
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+    for variant_name in variant_names:
+        for name, fen, expected in PERFT_SUITE[variant_name]:
+            pos = suite_position(variant_name, fen)
+            for depth, expected_nodes in sorted(expected.items()):
+                if depth > max_depth:
+                    break
+                start = time.perf_counter()
+                nodes = count_perft(variant_name, pos, depth, backend)
+                elapsed = time.perf_counter() - start
+                total_nodes += nodes
+                total_time += elapsed
+                status = "ok" if nodes == expected_nodes else "FEHLER"
+                if nodes != expected_nodes:
+                    failures += 1
+                print(
+                    f"{variant_name:12} {name:22} Tiefe {depth}: {nodes:>9} "
+                    f"(erwartet {expected_nodes:>9}) {status:6} "
+                    f"{elapsed:6.2f}s {_format_rate(nodes, elapsed)}"
+                )
+    print(
+        f"Gesamt: {total_nodes} Knoten in {total_time:.2f}s "
+        f"({_format_rate(total_nodes, total_time)}), {failures} Abweichung(en)"
+    )
+    return failures
+
+
+def _suite_positions(variant_names):
+    for variant_name in variant_names:
+        for name, fen, _ in PERFT_SUITE[variant_name]:
+            yield variant_name, name, suite_position(variant_name, fen)
+
+
+def run_parallel_benchmark(variant_names, depth, workers):
+    # Vergleicht die parallele Wurzelsuche mit der Suche in einem Prozess
+    parallel = schach_engine.ParallelSearch(workers)
+    total_single = total_parallel = 0.0
+    try:
+        for variant_name, name, pos in _suite_positions(variant_names):
+            search = schach_engine.Search(
+                pos.side, schach_engine.TranspositionTable(1 << 16)
+            )
+            start = time.perf_counter()
+            single_score, single_move = search.iterative_deepening(pos, depth)
+            single_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            parallel_score, parallel_move = parallel.search(pos, depth)
+            parallel_time = time.perf_counter() - start
+
+            total_single += single_time
+            total_parallel += parallel_time
+            print(
+                f"{variant_name:12} {name:22} "
+                f"1 Prozess: {single_time:6.2f}s ({single_score:>6}) "
+                f"{workers} Prozesse: {parallel_time:6.2f}s ({parallel_score:>6}) "
+                f"Speedup {single_time / parallel_time:4.2f}x"
+            )
+    finally:
+        parallel.close()
+    print(
+        f"Gesamt: 1 Prozess {total_single:.2f}s, {workers} Prozesse "
+        f"{total_parallel:.2f}s, Speedup {total_single / total_parallel:.2f}x"
+    )
+
+
+def run_search_comparison(variant_names, depth, mode_names, time_budget_ms=None):
+    # Gleiche Stellungen, gleiche Tiefe: Knoten, Zeit und Ergebnis je Suchvariante.
+    # Mit time_budget_ms sucht jede Variante gleich lange; dann zählt die erreichte
+    # Tiefe. Jede Suche bekommt eine frische Transpositionstabelle.
+    totals = {mode: [0, 0.0, 0, 0] for mode in mode_names}
+    for variant_name, name, pos in _suite_positions(variant_names):
+        parts = []
+        for mode in mode_names:
+            search = schach_engine.Search(
+                pos.side,
+                schach_engine.TranspositionTable(1 << 16),
+                **SEARCH_MODES[mode],
+            )
+            start = time.perf_counter()
+            score, move = search.iterative_deepening(pos, depth, time_budget_ms)
+            elapsed = time.perf_counter() - start
+            nodes = search.nodes + search.qnodes
+            reached = search.iterations[-1][0] if search.iterations else 0
+            totals[mode][0] += nodes
+            totals[mode][1] += elapsed
+            totals[mode][2] += reached
+            totals[mode][3] += search.qnodes
+            move_text = schach_engine.move_to_text(move) if move is not None else "-"
+            parts.append(
+                f"{mode}: {nodes:>8} Knoten {elapsed:6.2f}s T{reached:<2} "
+                f"{move_text:6} ({score:>6})"
+            )
+        print(f"{variant_name:12} {name:22} " + "  ".join(parts))
+    base_nodes = totals[mode_names[0]][0]
+    positions = sum(len(PERFT_SUITE[variant_name]) for variant_name in variant_names)
+    for mode in mode_names:
+        nodes, elapsed, reached, qnodes = totals[mode]
+        print(
+            f"Gesamt {mode:10} {nodes:>9} Knoten ({nodes / base_nodes:5.1%} "
+            f"von {mode_names[0]}, davon Ruhesuche {qnodes}) in {elapsed:.2f}s, "
+            f"mittlere Tiefe {reached / positions:.1f}"
+        )
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft und Benchmarks für 6x6-Schach")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    perft_parser = commands.add_parser("perft", help="Blätter bis Tiefe N zählen")
+    perft_parser.add_argument("--variant", choices=sorted(VARIANTS))
+    perft_parser.add_argument("-d", "--depth", type=int)
+    perft_parser.add_argument("--fen", help="Stellung statt der Testsuite")
+    perft_parser.add_argument("--divide", action="store_true", help="je Wurzelzug")
+    perft_parser.add_argument(
+        "--backend",
+        choices=PERFT_BACKENDS,
+        default="bitboard",
+        help="Zuggenerator: Engine oder Listen-Backend der GUI-Skripte",
+    )
+
+    parallel_parser = commands.add_parser(
+        "parallel", help="Speedup der parallelen Wurzelsuche messen"
+    )
+    parallel_parser.add_argument("--variant", choices=sorted(VARIANTS))
+    parallel_parser.add_argument("-d", "--depth", type=int, default=4)
+    parallel_parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1
+    )
+
+    compare_parser = commands.add_parser(
+        "vergleich", help="Knotenzahlen verschiedener Suchvarianten vergleichen"
+    )
+    compare_parser.add_argument("--variant", choices=sorted(VARIANTS))
+    compare_parser.add_argument("-d", "--depth", type=int)
+    compare_parser.add_argument(
+        "-t", "--time", type=int, help="Millisekunden je Stellung statt fester Tiefe"
+    )
+    compare_parser.add_argument(
+        "--modes",
+        default="minimax,pvs",
+        help="kommagetrennt, erste Variante ist die Basis: " + ", ".join(SEARCH_MODES),
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "perft":
+        if args.fen or args.divide:
+            variant_name = args.variant or "daschach"
+            pos = suite_position(variant_name, args.fen)
+            run_perft(variant_name, pos, args.depth or 3, args.divide, args.backend)
+            return 0
+        variant_names = [args.variant] if args.variant else sorted(VARIANTS)
+        failures = run_perft_suite(variant_names, args.depth or 4, args.backend)
+        return 1 if failures else 0
+    if args.command == "parallel":
+        variant_names = [args.variant] if args.variant else sorted(VARIANTS)
+        run_parallel_benchmark(variant_names, args.depth, args.workers)
+    if args.command == "vergleich":
+        mode_names = args.modes.split(",")
+        unknown = [mode for mode in mode_names if mode not in SEARCH_MODES]
+        if unknown:
+            parser.error(f"Unbekannte Suchvariante: {', '.join(unknown)}")
+        variant_names = [args.variant] if args.variant else sorted(VARIANTS)
+        if args.time is None:
+            run_search_comparison(variant_names, args.depth or 4, mode_names)
+        else:
+            run_search_comparison(
+                variant_names, args.depth or 64, mode_names, args.time
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# --- Eröffnungsbuch für die 6x6-Varianten offline bauen ---
+#
+#   python schach_buch.py                               # beide Varianten
+#   python schach_buch.py --variant daschach --plies 6 --depth 7
+#
+# Für jede Farbe wird ab der Startstellung auf den eigenen Zügen nur der Buchzug
+# verfolgt und auf den gegnerischen Zügen jede legale Antwort. Jede Stellung mit
+# der Buchfarbe am Zug bekommt eine tiefe Suche; das Ergebnis landet in
+# <variante>.buch neben den Skripten, das die GUI vor jeder Suche abfragt.
+import argparse
+import os
+import sys
+import time
+
+import daschach
+import grok_schach
+import schach_engine
+
+VARIANTS = {
+    "daschach": daschach.VARIANT,
+    "grok_schach": grok_schach.VARIANT,
+}
+
+
+def book_path(variant_name):
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), f"{variant_name}.buch"
+    )
+
+
+def build_book(variant, plies, depth, time_budget_ms=None, book=None):
+    book = book if book is not None else schach_engine.OpeningBook()
+    tt = schach_engine.TranspositionTable(1 << 18)
+    searched = 0
+    start_time = time.perf_counter()
+
+    def book_move(pos):
+        nonlocal searched
+        entry = book.lookup(pos.key)
+        if entry is not None:  # über eine Zugumstellung schon erreicht
+            return entry[0]
+        tt.new_search()
+        search = schach_engine.Search(pos.side, tt, pvs=True, null_move=True, lmr=True)
+        score, move = search.iterative_deepening(pos, depth, time_budget_ms)
+        if move is None:
+            return None
+        reached = search.iterations[-1][0] if search.iterations else 0
+        score = max(-32000, min(32000, score))
+        book.add(pos.key, move, score, reached)
+        searched += 1
+        print(
+            f"  {len(book):5} Stellungen, Tiefe {reached}, "
+            f"{schach_engine.position_to_fen(pos)}: "
+            f"{schach_engine.move_to_text(move)} ({score})"
+            f"  [{time.perf_counter() - start_time:.0f}s]",
+            flush=True,
+        )
+        return move
+
+    def walk(pos, book_color, ply):
+        if ply >= plies or pos.is_draw_by_rule(3):
+            return
+        if pos.side == book_color:
+            move = book_move(pos)
+            moves = [move] if move is not None else []
+        else:
+            moves = pos.generate_legal_moves()
+        for move in moves:
+            pos.make_move(move)
+            walk(pos, book_color, ply + 1)
+            pos.unmake_move()
+
+    for book_color in (schach_engine.WHITE, schach_engine.BLACK):
+        walk(variant.initial_position(), book_color, 0)
+    return book, searched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Eröffnungsbuch für 6x6-Schach aus tiefen Suchen bauen"
+    )
+    parser.add_argument("--variant", choices=sorted(VARIANTS))
+    parser.add_argument("-p", "--plies", type=int, default=4, help="Halbzüge ab Start")
+    parser.add_argument("-d", "--depth", type=int, default=7, help="Suchtiefe")
+    parser.add_argument(
+        "-t", "--time", type=int, help="Millisekunden je Stellung (begrenzt die Tiefe)"
+    )
+    parser.add_argument("-o", "--output", help="Zieldatei (nur mit --variant)")
+    args = parser.parse_args(argv)
+    if args.output and not args.variant:
+        parser.error("--output braucht --variant")
+
+    variant_names = [args.variant] if args.variant else sorted(VARIANTS)
+    for variant_name in variant_names:
+        path = args.output or book_path(variant_name)
+        print(f"{variant_name}: {args.plies} Halbzüge, Tiefe {args.depth} -> {path}")
+        book, searched = build_book(
+            VARIANTS[variant_name], args.plies, args.depth, args.time
+        )
+        book.save(path)
+        print(f"{variant_name}: {len(book)} Einträge, {searched} Suchen")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
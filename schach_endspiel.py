@@ -0,0 +1,188 @@
+# --- Endspieldatenbanken (KQK, KRK, KPK) für die 6x6-Varianten bauen ---
+#
+#   python schach_endspiel.py                           # beide Varianten
+#   python schach_endspiel.py --variant daschach -o /tmp/daschach.tb
+#
+# Retrograde Analyse: Jede Stellung wird einmal vorwärts aufgezählt, danach
+# werden Matt- und Verluststellungen Halbzug für Halbzug zu ihren Vorgängern
+# zurückgerechnet. Das Ergebnis (Distanz zum Matt je Stellung) landet in
+# <variante>.tb neben den Skripten; die GUI blendet die Datei per mmap ein.
+import argparse
+import os
+import sys
+import time
+
+import daschach
+import grok_schach
+import schach_engine
+from schach_engine import BLACK, KING, NUM_SQUARES, TB_INVALID, TB_SIZE, WHITE
+
+VARIANTS = {
+    "daschach": daschach.VARIANT,
+    "grok_schach": grok_schach.VARIANT,
+}
+
+# KPK braucht KQK für die Umwandlung, also zuerst die Tabellen ohne Bauern
+BUILD_ORDER = ("KQK", "KRK", "KPK")
+MAX_DISTANCE = 126  # passt als Sieg (d) und Verlust (-(d + 1)) in ein Byte
+
+
+def tablebase_path(variant_name):
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), f"{variant_name}.tb"
+    )
+
+
+def _setup_position(variant, ptype, index):
+    # Stellung zum Index oder None, wenn sie nicht vorkommen kann
+    rest, piece_sq = divmod(index, NUM_SQUARES)
+    rest, black_king = divmod(rest, NUM_SQUARES)
+    side, white_king = divmod(rest, NUM_SQUARES)
+    if len({white_king, black_king, piece_sq}) < 3:
+        return None
+    if schach_engine.KING_ATTACKS[white_king] >> black_king & 1:
+        return None
+    if ptype == schach_engine.PAWN and piece_sq // schach_engine.BOARD_SIZE in (
+        0,
+        schach_engine.BOARD_SIZE - 1,
+    ):
+        return None
+    pos = schach_engine.Position(variant)
+    pos._put(WHITE, KING, white_king)
+    pos._put(BLACK, KING, black_king)
+    pos._put(WHITE, ptype, piece_sq)
+    if side == BLACK:
+        pos.side = BLACK
+        pos.key ^= schach_engine.ZOBRIST_SIDE
+    if pos.in_check(1 - side):
+        return None
+    return pos
+
+
+def solve_table(variant, name, solved):
+    # Liefert die Tabelle als bytearray; solved enthält bereits gebaute Tabellen
+    ptype = schach_engine.TB_TABLES[name]
+    table = bytearray(TB_SIZE)
+    result = [None] * TB_SIZE  # None ungelöst, sonst (Sieg?, Distanz)
+    predecessors = [[] for _ in range(TB_SIZE)]
+    remaining = [0] * TB_SIZE  # noch nicht als gegnerischer Sieg gelöste Züge
+    longest_loss = [0] * TB_SIZE  # längster gegnerischer Sieg unter den Zügen
+    escape = [False] * TB_SIZE  # ein Zug hält mindestens remis
+    buckets = {}  # Distanz -> [(Index, Sieg?)]
+
+    def push(distance, index, win):
+        buckets.setdefault(distance, []).append((index, win))
+
+    for index in range(TB_SIZE):
+        pos = _setup_position(variant, ptype, index)
+        if pos is None:
+            table[index] = TB_INVALID & 0xFF
+            result[index] = False, 0  # nie Vorgänger, also ohne Wirkung
+            continue
+        moves = pos.generate_legal_moves()
+        if not moves:
+            if pos.in_check():
+                push(0, index, False)
+            else:
+                result[index] = None, 0  # Patt
+            continue
+        for move in moves:
+            pos.make_move(move)
+            lookup = schach_engine.tb_lookup_index(pos)
+            pos.unmake_move()
+            if lookup is None:
+                escape[index] = True  # Figur geschlagen: König gegen König
+            elif lookup[0] == name:
+                predecessors[lookup[1]].append(index)
+                remaining[index] += 1
+            else:
+                value = solved[lookup[0]][lookup[1]]
+                value = value - 256 if value > 127 else value
+                if value > 0:
+                    longest_loss[index] = max(longest_loss[index], value)
+                    continue
+                escape[index] = True
+                if value < 0:
+                    push(-value, index, True)  # Gegner verliert in -value - 1
+        if not remaining[index] and not escape[index]:
+            push(longest_loss[index] + 1, index, False)
+
+    distance = 0
+    max_distance = max(buckets) if buckets else 0
+    while distance <= max_distance:
+        for index, win in buckets.pop(distance, ()):
+            if result[index] is not None:
+                continue
+            result[index] = win, distance
+            if distance > MAX_DISTANCE:
+                raise ValueError(f"{name}: Distanz {distance} passt nicht ins Byte")
+            table[index] = distance if win else (-(distance + 1)) & 0xFF
+            for parent in predecessors[index]:
+                if result[parent] is not None:
+                    continue
+                if not win:
+                    push(distance + 1, parent, True)
+                    max_distance = max(max_distance, distance + 1)
+                    continue
+                remaining[parent] -= 1
+                longest_loss[parent] = max(longest_loss[parent], distance)
+                if not remaining[parent] and not escape[parent]:
+                    push(longest_loss[parent] + 1, parent, False)
+                    max_distance = max(max_distance, longest_loss[parent] + 1)
+        distance += 1
+    # Alles Ungelöste (und Patt) bleibt 0 = Remis
+    return table
+
+
+def write_tablebase(path, tables):
+    header = schach_engine._TB_HEADER
+    entry = schach_engine._TB_TABLE_ENTRY
+    offset = header.size + entry.size * len(tables)
+    with open(path, "wb") as f:
+        f.write(
+            header.pack(schach_engine.TB_MAGIC, schach_engine.TB_VERSION, len(tables))
+        )
+        for name, table in tables.items():
+            f.write(entry.pack(name.encode(), offset, len(table)))
+            offset += len(table)
+        for table in tables.values():
+            f.write(table)
+
+
+def build_tablebase(variant):
+    tables = {}
+    for name in BUILD_ORDER:
+        start = time.perf_counter()
+        tables[name] = solve_table(variant, name, tables)
+        values = [v - 256 if v > 127 else v for v in tables[name]]
+        wins = sum(1 for v in values if 0 < v)
+        losses = sum(1 for v in values if v < 0 and v != TB_INVALID)
+        longest = max((v for v in values if v > 0), default=0)
+        print(
+            f"  {name}: {wins} Siege, {losses} Verluste, längstes Matt in "
+            f"{longest} Halbzügen [{time.perf_counter() - start:.1f}s]",
+            flush=True,
+        )
+    return tables
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Endspieldatenbanken für 6x6-Schach retrograd berechnen"
+    )
+    parser.add_argument("--variant", choices=sorted(VARIANTS))
+    parser.add_argument("-o", "--output", help="Zieldatei (nur mit --variant)")
+    args = parser.parse_args(argv)
+    if args.output and not args.variant:
+        parser.error("--output braucht --variant")
+
+    variant_names = [args.variant] if args.variant else sorted(VARIANTS)
+    for variant_name in variant_names:
+        path = args.output or tablebase_path(variant_name)
+        print(f"{variant_name}: {', '.join(BUILD_ORDER)} -> {path}")
+        write_tablebase(path, build_tablebase(VARIANTS[variant_name]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2307 @@
+# --- Bitboard-Backend für die 6x6-Schachvarianten (daschach.py, grok_schach.py) ---
+#
+# Jede Figurenart und Farbe bekommt ein 36-Bit-Integer; Bit (r * 6 + c) steht für
+# das Feld (r, c) in der Koordinatenlogik der GUI-Skripte (Reihe 0 = schwarze
+# Grundreihe). Die Rochadegeometrie unterscheidet sich je Variante und wird über
+# ein Variant-Objekt hereingereicht.
+
+import bisect
+import mmap
+import multiprocessing
+import random
+import struct
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+BOARD_SIZE = 6
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+FULL_BOARD = (1 << NUM_SQUARES) - 1
+
+WHITE, BLACK = 0, 1
+COLOR_NAMES = ("white", "black")
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_LETTERS = "PNBRQK"
+
+# Ganzzahlige Figurencodes für das Feld-Array (Mailbox) der Position:
+# Bit 0 = Farbe, die Bits darüber = Figurenart + 1; 0 ist ein leeres Feld
+EMPTY = 0
+CODE_COLOR = [code & 1 for code in range(14)]
+CODE_TYPE = [(code >> 1) - 1 for code in range(14)]  # EMPTY -> -1
+
+
+def piece_code(color, ptype):
+    return (ptype + 1) << 1 | color
+
+
+# Übersetzung an der Grenze zu GUI und Ein-/Ausgabe ("wP", "bK", ...)
+PIECE_CODES = {
+    "wb"[color] + PIECE_LETTERS[ptype]: piece_code(color, ptype)
+    for color in (WHITE, BLACK)
+    for ptype in range(6)
+}
+PIECE_NAMES = {code: name for name, code in PIECE_CODES.items()}
+
+# Wie PIECE_VALUES in den GUI-Skripten, nach Figurenart indiziert
+PIECE_VALUES = (10, 30, 35, 50, 90, 0)
+CHECKMATE_SCORE = 10000
+STALEMATE_SCORE = 0
+DRAW_SCORE = 0  # Stellungswiederholung und Regel ohne Fortschritt
+# Halbzüge ohne Bauern- oder Schlagzug bis zum Remis (50-Züge-Regel)
+NO_PROGRESS_PLIES = 100
+
+# Rochaderechte als Bitmaske, Reihenfolge wie die Schlüssel in castling_rights
+CASTLING_KEYS = (
+    "white_kingside",
+    "white_queenside",
+    "black_kingside",
+    "black_queenside",
+)
+
+# Zugkodierung: von | nach << 6 | art << 12 | umwandlungsfigur << 15
+MOVE_NORMAL = 0
+MOVE_DOUBLE_PUSH = 1
+MOVE_EN_PASSANT = 2
+MOVE_CASTLE = 3
+MOVE_PROMOTION = 4
+
+KNIGHT_DIRECTIONS = [
+    (1, 2),
+    (1, -2),
+    (-1, 2),
+    (-1, -2),
+    (2, 1),
+    (2, -1),
+    (-2, 1),
+    (-2, -1),
+]
+KING_DIRECTIONS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+ROOK_DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+BISHOP_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def square_index(r, c):
+    return r * BOARD_SIZE + c
+
+
+def square_coords(sq):
+    return divmod(sq, BOARD_SIZE)
+
+
+def make_move_code(from_sq, to_sq, flag=MOVE_NORMAL, promotion=0):
+    return from_sq | (to_sq << 6) | (flag << 12) | (promotion << 15)
+
+
+def move_from(move):
+    return move & 63
+
+
+def move_to(move):
+    return (move >> 6) & 63
+
+
+def move_flag(move):
+    return (move >> 12) & 7
+
+
+def move_promotion(move):
+    return move >> 15
+
+
+def _iter_bits(bb):
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+# --- Angriffstabellen, einmal beim Import aufgebaut ---
+def _squares_in_direction(sq, dr, dc, max_steps):
+    r, c = square_coords(sq)
+    squares = []
+    for step in range(1, max_steps + 1):
+        nr, nc = r + dr * step, c + dc * step
+        if not (0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE):
+            break
+        squares.append(square_index(nr, nc))
+    return squares
+
+
+def _bitboard(squares):
+    bb = 0
+    for sq in squares:
+        bb |= 1 << sq
+    return bb
+
+
+# Nachbarfelder als Feldlisten (für das Listen-Backend) und als Bitboards
+KNIGHT_NEIGHBORS = [
+    [t for dr, dc in KNIGHT_DIRECTIONS for t in _squares_in_direction(sq, dr, dc, 1)]
+    for sq in range(NUM_SQUARES)
+]
+KING_NEIGHBORS = [
+    [t for dr, dc in KING_DIRECTIONS for t in _squares_in_direction(sq, dr, dc, 1)]
+    for sq in range(NUM_SQUARES)
+]
+KNIGHT_ATTACKS = [_bitboard(squares) for squares in KNIGHT_NEIGHBORS]
+KING_ATTACKS = [_bitboard(squares) for squares in KING_NEIGHBORS]
+# PAWN_ATTACKS[Farbe][Feld]: Felder, die ein Bauer dieser Farbe von dort angreift
+PAWN_ATTACKS = [
+    [
+        _bitboard(
+            t for dc in (-1, 1) for t in _squares_in_direction(sq, direction, dc, 1)
+        )
+        for sq in range(NUM_SQUARES)
+    ]
+    for direction in (-1, 1)
+]
+
+# Strahlen je Richtung und Feld, nach Entfernung geordnet
+ROOK_RAYS = [
+    [_squares_in_direction(sq, dr, dc, BOARD_SIZE) for dr, dc in ROOK_DIRECTIONS]
+    for sq in range(NUM_SQUARES)
+]
+BISHOP_RAYS = [
+    [_squares_in_direction(sq, dr, dc, BOARD_SIZE) for dr, dc in BISHOP_DIRECTIONS]
+    for sq in range(NUM_SQUARES)
+]
+# Bitboard-Strahlen mit der Information, ob die Feldnummern entlang des Strahls
+# wachsen (erster Blocker = niedrigstes Bit) oder fallen (höchstes Bit)
+_ROOK_RAY_BITBOARDS = [
+    [
+        (_bitboard(ray), dr * BOARD_SIZE + dc > 0)
+        for ray, (dr, dc) in zip(ROOK_RAYS[sq], ROOK_DIRECTIONS)
+    ]
+    for sq in range(NUM_SQUARES)
+]
+_BISHOP_RAY_BITBOARDS = [
+    [
+        (_bitboard(ray), dr * BOARD_SIZE + dc > 0)
+        for ray, (dr, dc) in zip(BISHOP_RAYS[sq], BISHOP_DIRECTIONS)
+    ]
+    for sq in range(NUM_SQUARES)
+]
+
+
+# BETWEEN[a][b]: Felder echt zwischen a und b auf gemeinsamer Linie, sonst 0.
+# Für Schach- und Fesselungsmasken der legalen Zuggenerierung.
+BETWEEN = [[0] * NUM_SQUARES for _ in range(NUM_SQUARES)]
+for _sq in range(NUM_SQUARES):
+    for _ray in ROOK_RAYS[_sq] + BISHOP_RAYS[_sq]:
+        for _i, _target in enumerate(_ray):
+            BETWEEN[_sq][_target] = _bitboard(_ray[:_i])
+# Linien (Turm bzw. Läufer) ab einem Feld auf leerem Brett
+ROOK_LINES = [
+    _bitboard(t for ray in ROOK_RAYS[sq] for t in ray) for sq in range(NUM_SQUARES)
+]
+BISHOP_LINES = [
+    _bitboard(t for ray in BISHOP_RAYS[sq] for t in ray) for sq in range(NUM_SQUARES)
+]
+
+
+def _ray_attacks(rays, occupied):
+    attacks = 0
+    for ray, increasing in rays:
+        blockers = ray & occupied
+        if blockers:
+            if increasing:
+                first = (blockers & -blockers).bit_length() - 1
+                ray &= (1 << (first + 1)) - 1
+            else:
+                first = blockers.bit_length() - 1
+                ray &= ~((1 << first) - 1)
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(sq, occupied):
+    return _ray_attacks(_ROOK_RAY_BITBOARDS[sq], occupied)
+
+
+def bishop_attacks(sq, occupied):
+    return _ray_attacks(_BISHOP_RAY_BITBOARDS[sq], occupied)
+
+
+def piece_attacks(ptype, sq, occupied):
+    if ptype == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if ptype == BISHOP:
+        return bishop_attacks(sq, occupied)
+    if ptype == ROOK:
+        return rook_attacks(sq, occupied)
+    if ptype == QUEEN:
+        return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+    return KING_ATTACKS[sq]
+
+
+# --- Figur-Feld-Tabellen für das 6x6-Brett ---
+# Aus Sicht von Weiß, Reihe 0 ist die gegnerische Grundreihe; Schwarz liest gespiegelt.
+# Größenordnung: ein Bauer ist 10 wert (PIECE_VALUES).
+PIECE_SQUARE_TABLES = {
+    PAWN: [
+        [0, 0, 0, 0, 0, 0],
+        [8, 8, 9, 9, 8, 8],
+        [3, 4, 5, 5, 4, 3],
+        [1, 2, 3, 3, 2, 1],
+        [0, 0, -1, -1, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+    ],
+    KNIGHT: [
+        [-5, -3, -2, -2, -3, -5],
+        [-3, 0, 1, 1, 0, -3],
+        [-2, 1, 3, 3, 1, -2],
+        [-2, 1, 3, 3, 1, -2],
+        [-3, 0, 1, 1, 0, -3],
+        [-5, -3, -2, -2, -3, -5],
+    ],
+    BISHOP: [
+        [-2, -1, -1, -1, -1, -2],
+        [-1, 1, 1, 1, 1, -1],
+        [-1, 1, 2, 2, 1, -1],
+        [-1, 1, 2, 2, 1, -1],
+        [-1, 2, 1, 1, 2, -1],
+        [-2, -1, -1, -1, -1, -2],
+    ],
+    ROOK: [
+        [0, 0, 0, 0, 0, 0],
+        [2, 3, 3, 3, 3, 2],
+        [0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0],
+        [-1, 0, 0, 0, 0, -1],
+        [0, 0, 1, 1, 0, 0],
+    ],
+    QUEEN: [
+        [-2, -1, -1, -1, -1, -2],
+        [-1, 0, 0, 0, 0, -1],
+        [-1, 0, 1, 1, 0, -1],
+        [-1, 0, 1, 1, 0, -1],
+        [-1, 0, 0, 0, 0, -1],
+        [-2, -1, -1, -1, -1, -2],
+    ],
+    KING: [
+        [-6, -6, -6, -6, -6, -6],
+        [-5, -5, -5, -5, -5, -5],
+        [-4, -4, -4, -4, -4, -4],
+        [-3, -3, -3, -3, -3, -3],
+        [-1, -1, -2, -2, -1, -1],
+        [1, 2, 0, 0, 2, 1],
+    ],
+}
+
+# Material plus Feldbonus je (Farbe * 6 + Figurenart, Feld), aus Sicht von Weiß
+SQUARE_SCORES = [[0] * NUM_SQUARES for _ in range(12)]
+for _ptype, _table in PIECE_SQUARE_TABLES.items():
+    for _sq in range(NUM_SQUARES):
+        _r, _c = square_coords(_sq)
+        SQUARE_SCORES[WHITE * 6 + _ptype][_sq] = PIECE_VALUES[_ptype] + _table[_r][_c]
+        SQUARE_SCORES[BLACK * 6 + _ptype][_sq] = -(
+            PIECE_VALUES[_ptype] + _table[BOARD_SIZE - 1 - _r][_c]
+        )
+
+
+# --- Zobrist-Schlüssel ---
+# Fester Seed, damit Schlüssel über Programmläufe hinweg gleich bleiben
+_zobrist_rng = random.Random(0x6C5A_C4AC)
+ZOBRIST_PIECES = [
+    [_zobrist_rng.getrandbits(64) for _ in range(NUM_SQUARES)] for _ in range(12)
+]
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+ZOBRIST_CASTLING = [_zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_CASTLING[0] = 0
+ZOBRIST_EP_FILE = [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE)]
+
+
+def _ep_key(ep_square):
+    if ep_square is None:
+        return 0
+    return ZOBRIST_EP_FILE[ep_square % BOARD_SIZE]
+
+
+# --- Variante: Startaufstellung und Rochadegeometrie ---
+class Variant:
+    def __init__(self, name, initial_board, castling_geometry):
+        self.name = name
+        self.initial_board = initial_board
+        # Je Rochaderecht: (Bit, Farbe, König von/nach, Turm von/nach, Felder die
+        # leer sein müssen, Felder die nicht angegriffen sein dürfen, Notation)
+        self.castles = []
+        for bit_index, key in enumerate(CASTLING_KEYS):
+            geometry = castling_geometry[key]
+            self.castles.append(
+                (
+                    1 << bit_index,
+                    WHITE if key.startswith("white") else BLACK,
+                    square_index(*geometry["king"]),
+                    square_index(*geometry["king_to"]),
+                    square_index(*geometry["rook"]),
+                    square_index(*geometry["rook_to"]),
+                    sum(1 << square_index(*sq) for sq in geometry["empty"]),
+                    [square_index(*sq) for sq in geometry["safe"]],
+                    "O-O" if key.endswith("kingside") else "O-O-O",
+                )
+            )
+        self.castle_by_target = {
+            (castle[1], castle[3]): castle for castle in self.castles
+        }
+        # Rechte, die verloren gehen, wenn ein Zug dieses Feld verlässt
+        self.rights_cleared_from = [0] * NUM_SQUARES
+        for castle in self.castles:
+            self.rights_cleared_from[castle[4]] |= castle[0]
+
+    def initial_position(self):
+        return Position.from_state(
+            self, self.initial_board, None, dict.fromkeys(CASTLING_KEYS, True), "white"
+        )
+
+
+# --- Stellung ---
+class Position:
+    __slots__ = (
+        "variant",
+        "pieces",
+        "occupied_by",
+        "side",
+        "ep_square",
+        "castling",
+        "key",
+        "score",
+        "squares",
+        "halfmove_clock",
+        "key_history",
+        "undo_stack",
+    )
+
+    def __init__(self, variant):
+        self.variant = variant
+        self.pieces = [0] * 12  # Index: Farbe * 6 + Figurenart
+        self.occupied_by = [0, 0]
+        self.side = WHITE
+        self.ep_square = None
+        self.castling = 0
+        self.key = 0  # Zobrist-Schlüssel, wird in _put/_remove/make_move mitgeführt
+        self.score = 0  # Material + Figur-Feld-Tabellen aus Sicht von Weiß, ebenso
+        self.squares = [EMPTY] * NUM_SQUARES  # Figurencode je Feld, wie pieces
+        # Halbzüge seit dem letzten Bauernzug oder Schlagzug
+        self.halfmove_clock = 0
+        # Schlüssel aller früheren Stellungen (Partie und Suchpfad), älteste zuerst
+        self.key_history = []
+        # Je gespielten Zug: (Zug, Figurenart, geschlagene Figurenart,
+        # vorheriges En-passant-Feld, vorherige Rochaderechte, vorheriger Schlüssel,
+        # vorheriger Halbzugzähler)
+        self.undo_stack = []
+
+    @classmethod
+    def from_state(
+        cls,
+        variant,
+        board,
+        ep_target,
+        castling_rights,
+        side_to_move,
+        key_history=(),
+        halfmove_clock=0,
+    ):
+        # key_history/halfmove_clock: bisheriger Partieverlauf für die Remisregeln
+        pos = cls(variant)
+        pos.key_history = list(key_history)
+        pos.halfmove_clock = halfmove_clock
+        for r in range(BOARD_SIZE):
+            for c in range(BOARD_SIZE):
+                piece = board[r][c]
+                if piece:
+                    code = PIECE_CODES[piece]
+                    pos._put(CODE_COLOR[code], CODE_TYPE[code], square_index(r, c))
+        pos.side = WHITE if side_to_move == "white" else BLACK
+        pos.ep_square = square_index(*ep_target) if ep_target else None
+        for bit_index, key in enumerate(CASTLING_KEYS):
+            if castling_rights.get(key):
+                pos.castling |= 1 << bit_index
+        pos.key ^= ZOBRIST_CASTLING[pos.castling] ^ _ep_key(pos.ep_square)
+        if pos.side == BLACK:
+            pos.key ^= ZOBRIST_SIDE
+        return pos
+
+    def to_state(self):
+        board = [[None] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        king_positions = {}
+        for sq, code in enumerate(self.squares):
+            if code:
+                r, c = square_coords(sq)
+                board[r][c] = PIECE_NAMES[code]
+                if CODE_TYPE[code] == KING:
+                    king_positions[COLOR_NAMES[CODE_COLOR[code]]] = (r, c)
+        ep_target = (
+            square_coords(self.ep_square) if self.ep_square is not None else None
+        )
+        castling_rights = {
+            key: bool(self.castling & (1 << i)) for i, key in enumerate(CASTLING_KEYS)
+        }
+        return board, king_positions, ep_target, castling_rights
+
+    def copy(self):
+        pos = Position(self.variant)
+        pos.pieces = self.pieces[:]
+        pos.occupied_by = self.occupied_by[:]
+        pos.side = self.side
+        pos.ep_square = self.ep_square
+        pos.castling = self.castling
+        pos.key = self.key
+        pos.score = self.score
+        pos.squares = self.squares[:]
+        pos.halfmove_clock = self.halfmove_clock
+        pos.key_history = self.key_history[:]
+        return pos
+
+    def _put(self, color, ptype, sq):
+        bit = 1 << sq
+        self.pieces[color * 6 + ptype] |= bit
+        self.occupied_by[color] |= bit
+        self.key ^= ZOBRIST_PIECES[color * 6 + ptype][sq]
+        self.score += SQUARE_SCORES[color * 6 + ptype][sq]
+        self.squares[sq] = (ptype + 1) << 1 | color
+
+    def _remove(self, color, ptype, sq):
+        bit = 1 << sq
+        self.pieces[color * 6 + ptype] &= ~bit
+        self.occupied_by[color] &= ~bit
+        self.key ^= ZOBRIST_PIECES[color * 6 + ptype][sq]
+        self.score -= SQUARE_SCORES[color * 6 + ptype][sq]
+        self.squares[sq] = EMPTY
+
+    def piece_at(self, sq):
+        code = self.squares[sq]
+        if not code:
+            return None
+        return CODE_COLOR[code], CODE_TYPE[code]
+
+    def king_square(self, color):
+        king_bb = self.pieces[color * 6 + KING]
+        return king_bb.bit_length() - 1 if king_bb else None
+
+    def mobility(self):
+        # Angegriffene Felder ohne eigene Figur (Springer bis Dame), Weiß minus Schwarz
+        occupied = self.occupied_by[WHITE] | self.occupied_by[BLACK]
+        balance = 0
+        for color in (WHITE, BLACK):
+            reachable = FULL_BOARD & ~self.occupied_by[color]
+            count = 0
+            for ptype in MOBILITY_PIECES:
+                for sq in _iter_bits(self.pieces[color * 6 + ptype]):
+                    count += (
+                        piece_attacks(ptype, sq, occupied) & reachable
+                    ).bit_count()
+            balance += count if color == WHITE else -count
+        return balance
+
+    # --- Angriffe ---
+    def is_square_attacked(self, sq, by_color, occupied=None):
+        # Rückwärts vom Zielfeld: steht auf einem der Felder, von denen aus eine
+        # Figurenart das Ziel erreicht, eine solche Figur des Angreifers?
+        # occupied: abweichende Belegung, z.B. ohne den ziehenden König
+        pieces = self.pieces
+        base = by_color * 6
+        if PAWN_ATTACKS[1 - by_color][sq] & pieces[base + PAWN]:
+            return True
+        if KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT]:
+            return True
+        if KING_ATTACKS[sq] & pieces[base + KING]:
+            return True
+        if occupied is None:
+            occupied = self.occupied_by[WHITE] | self.occupied_by[BLACK]
+        queens = pieces[base + QUEEN]
+        if rook_attacks(sq, occupied) & (pieces[base + ROOK] | queens):
+            return True
+        if bishop_attacks(sq, occupied) & (pieces[base + BISHOP] | queens):
+            return True
+        return False
+
+    def attackers_to(self, sq, occupied):
+        # Alle Figuren beider Farben, die sq bei dieser Belegung angreifen
+        pieces = self.pieces
+        rook_like = pieces[ROOK] | pieces[QUEEN] | pieces[6 + ROOK] | pieces[6 + QUEEN]
+        bishop_like = (
+            pieces[BISHOP] | pieces[QUEEN] | pieces[6 + BISHOP] | pieces[6 + QUEEN]
+        )
+        return occupied & (
+            PAWN_ATTACKS[BLACK][sq] & pieces[WHITE * 6 + PAWN]
+            | PAWN_ATTACKS[WHITE][sq] & pieces[BLACK * 6 + PAWN]
+            | KNIGHT_ATTACKS[sq] & (pieces[KNIGHT] | pieces[6 + KNIGHT])
+            | KING_ATTACKS[sq] & (pieces[KING] | pieces[6 + KING])
+            | rook_attacks(sq, occupied) & rook_like
+            | bishop_attacks(sq, occupied) & bishop_like
+        )
+
+    def see(self, move):
+        # Static Exchange Evaluation: Materialbilanz (PIECE_VALUES) des kompletten
+        # Abtauschs auf dem Zielfeld, wenn beide Seiten immer mit der billigsten
+        # Figur zurückschlagen und jederzeit aufhören dürfen. Röntgenangriffe
+        # hinter weggenommenen Figuren werden durch Neuberechnung erfasst.
+        flag = move_flag(move)
+        if flag == MOVE_CASTLE:
+            return 0
+        from_sq = move_from(move)
+        to_sq = move_to(move)
+        occupied = (self.occupied_by[WHITE] | self.occupied_by[BLACK]) & ~(1 << from_sq)
+        if flag == MOVE_EN_PASSANT:
+            gains = [PIECE_VALUES[PAWN]]
+            occupied &= ~(1 << _en_passant_victim(to_sq, self.side))
+        else:
+            target = self.squares[to_sq]
+            gains = [PIECE_VALUES[CODE_TYPE[target]] if target else 0]
+        on_square = CODE_TYPE[self.squares[from_sq]]
+        if flag == MOVE_PROMOTION:
+            gains[0] += PIECE_VALUES[QUEEN] - PIECE_VALUES[PAWN]
+            on_square = QUEEN
+        side = 1 - self.side
+        attackers = self.attackers_to(to_sq, occupied)
+        while True:
+            own_attackers = attackers & self.occupied_by[side]
+            if not own_attackers:
+                break
+            for ptype in range(6):
+                candidates = own_attackers & self.pieces[side * 6 + ptype]
+                if candidates:
+                    break
+            if ptype == KING and attackers & self.occupied_by[1 - side]:
+                break  # der König darf nicht in einen Angriff schlagen
+            gains.append(PIECE_VALUES[on_square] - gains[-1])
+            on_square = ptype
+            occupied &= ~(candidates & -candidates)
+            attackers = self.attackers_to(to_sq, occupied)
+            side = 1 - side
+        for i in range(len(gains) - 1, 0, -1):
+            gains[i - 1] = -max(-gains[i - 1], gains[i])
+        return gains[0]
+
+    def in_check(self, color=None):
+        if color is None:
+            color = self.side
+        king_sq = self.king_square(color)
+        if king_sq is None:
+            return False
+        return self.is_square_attacked(king_sq, 1 - color)
+
+    # --- Zuggenerierung ---
+    def generate_pseudo_legal_moves(self):
+        moves = []
+        us = self.side
+        them = 1 - us
+        base = us * 6
+        own = self.occupied_by[us]
+        enemy = self.occupied_by[them]
+        occupied = own | enemy
+        empty = FULL_BOARD & ~occupied
+
+        direction = -1 if us == WHITE else 1
+        start_row = BOARD_SIZE - 2 if us == WHITE else 1
+        promo_row = 0 if us == WHITE else BOARD_SIZE - 1
+        ep_bit = 1 << self.ep_square if self.ep_square is not None else 0
+        for from_sq in _iter_bits(self.pieces[base + PAWN]):
+            r, c = square_coords(from_sq)
+            one_step = from_sq + direction * BOARD_SIZE
+            if empty & (1 << one_step):
+                if r + direction == promo_row:
+                    moves.append(
+                        make_move_code(from_sq, one_step, MOVE_PROMOTION, QUEEN)
+                    )
+                else:
+                    moves.append(make_move_code(from_sq, one_step))
+                    two_step = one_step + direction * BOARD_SIZE
+                    if r == start_row and empty & (1 << two_step):
+                        moves.append(
+                            make_move_code(from_sq, two_step, MOVE_DOUBLE_PUSH)
+                        )
+            attacks = PAWN_ATTACKS[us][from_sq]
+            for to_sq in _iter_bits(attacks & enemy):
+                if r + direction == promo_row:
+                    moves.append(make_move_code(from_sq, to_sq, MOVE_PROMOTION, QUEEN))
+                else:
+                    moves.append(make_move_code(from_sq, to_sq))
+            if attacks & ep_bit:
+                moves.append(make_move_code(from_sq, self.ep_square, MOVE_EN_PASSANT))
+
+        for ptype in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            for from_sq in _iter_bits(self.pieces[base + ptype]):
+                targets = piece_attacks(ptype, from_sq, occupied)
+                for to_sq in _iter_bits(targets & ~own):
+                    moves.append(make_move_code(from_sq, to_sq))
+
+        moves.extend(self._generate_castling_moves())
+        return moves
+
+    def _generate_castling_moves(self):
+        moves = []
+        us = self.side
+        occupied = self.occupied_by[WHITE] | self.occupied_by[BLACK]
+        for (
+            bit,
+            color,
+            king_from,
+            king_to,
+            rook_from,
+            _,
+            empty,
+            safe,
+            _,
+        ) in self.variant.castles:
+            if (
+                color == us
+                and self.castling & bit
+                and self.pieces[us * 6 + KING] & (1 << king_from)
+                and self.pieces[us * 6 + ROOK] & (1 << rook_from)
+                and not occupied & empty
+                and not any(self.is_square_attacked(sq, 1 - us) for sq in safe)
+            ):
+                moves.append(make_move_code(king_from, king_to, MOVE_CASTLE))
+        return moves
+
+    def generate_captures(self):
+        # Nur Schlagzüge und Umwandlungen, für die Ruhesuche
+        moves = []
+        us = self.side
+        base = us * 6
+        own = self.occupied_by[us]
+        enemy = self.occupied_by[1 - us]
+        occupied = own | enemy
+
+        direction = -1 if us == WHITE else 1
+        promo_row = 0 if us == WHITE else BOARD_SIZE - 1
+        ep_bit = 1 << self.ep_square if self.ep_square is not None else 0
+        for from_sq in _iter_bits(self.pieces[base + PAWN]):
+            promotes = from_sq // BOARD_SIZE + direction == promo_row
+            one_step = from_sq + direction * BOARD_SIZE
+            if promotes and not occupied & (1 << one_step):
+                moves.append(make_move_code(from_sq, one_step, MOVE_PROMOTION, QUEEN))
+            attacks = PAWN_ATTACKS[us][from_sq]
+            for to_sq in _iter_bits(attacks & enemy):
+                if promotes:
+                    moves.append(make_move_code(from_sq, to_sq, MOVE_PROMOTION, QUEEN))
+                else:
+                    moves.append(make_move_code(from_sq, to_sq))
+            if attacks & ep_bit:
+                moves.append(make_move_code(from_sq, self.ep_square, MOVE_EN_PASSANT))
+
+        for ptype in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            for from_sq in _iter_bits(self.pieces[base + ptype]):
+                targets = piece_attacks(ptype, from_sq, occupied)
+                for to_sq in _iter_bits(targets & enemy):
+                    moves.append(make_move_code(from_sq, to_sq))
+        return moves
+
+    def is_legal_after_pseudo_move(self, move):
+        us = self.side
+        self.make_move(move)
+        legal = not self.in_check(us)
+        self.unmake_move()
+        return legal
+
+    def checkers_and_pins(self):
+        # Schachgebende Figuren und gefesselte eigene Figuren der Seite am Zug.
+        # Ergebnis: (Bitboard der Schachgeber, {gefesseltes Feld: erlaubte Felder})
+        us = self.side
+        them = 1 - us
+        pieces = self.pieces
+        base = them * 6
+        king_sq = self.king_square(us)
+        own = self.occupied_by[us]
+        occupied = own | self.occupied_by[them]
+        queens = pieces[base + QUEEN]
+        rook_like = pieces[base + ROOK] | queens
+        bishop_like = pieces[base + BISHOP] | queens
+        checkers = (
+            PAWN_ATTACKS[us][king_sq] & pieces[base + PAWN]
+            | KNIGHT_ATTACKS[king_sq] & pieces[base + KNIGHT]
+            | rook_attacks(king_sq, occupied) & rook_like
+            | bishop_attacks(king_sq, occupied) & bishop_like
+        )
+        pins = {}
+        snipers = ROOK_LINES[king_sq] & rook_like | BISHOP_LINES[king_sq] & bishop_like
+        for sniper_sq in _iter_bits(snipers):
+            between = BETWEEN[king_sq][sniper_sq]
+            blockers = between & occupied
+            if blockers and blockers & (blockers - 1) == 0 and blockers & own:
+                pins[blockers.bit_length() - 1] = between | (1 << sniper_sq)
+        return checkers, pins
+
+    def generate_legal_moves(self):
+        # Schach- und Fesselungsmasken einmal je Knoten, dann nur legale Züge.
+        # En passant und Rochade (variantenabhängige Wege) werden wie bisher per
+        # make/unmake geprüft; sie sind selten.
+        us = self.side
+        them = 1 - us
+        king_sq = self.king_square(us)
+        if king_sq is None:
+            return self.generate_pseudo_legal_moves()
+        base = us * 6
+        own = self.occupied_by[us]
+        enemy = self.occupied_by[them]
+        occupied = own | enemy
+        moves = []
+
+        without_king = occupied & ~(1 << king_sq)
+        for to_sq in _iter_bits(KING_ATTACKS[king_sq] & ~own):
+            if not self.is_square_attacked(to_sq, them, without_king):
+                moves.append(make_move_code(king_sq, to_sq))
+
+        checkers, pins = self.checkers_and_pins()
+        if checkers & (checkers - 1):  # Doppelschach: nur Königszüge
+            return moves
+        if checkers:
+            target_mask = checkers | BETWEEN[king_sq][checkers.bit_length() - 1]
+        else:
+            target_mask = FULL_BOARD
+
+        direction = -1 if us == WHITE else 1
+        start_row = BOARD_SIZE - 2 if us == WHITE else 1
+        promo_row = 0 if us == WHITE else BOARD_SIZE - 1
+        ep_bit = 1 << self.ep_square if self.ep_square is not None else 0
+        for from_sq in _iter_bits(self.pieces[base + PAWN]):
+            mask = target_mask
+            if from_sq in pins:
+                mask &= pins[from_sq]
+            r = from_sq // BOARD_SIZE
+            one_step = from_sq + direction * BOARD_SIZE
+            if not occupied & (1 << one_step):
+                if r + direction == promo_row:
+                    if mask & (1 << one_step):
+                        moves.append(
+                            make_move_code(from_sq, one_step, MOVE_PROMOTION, QUEEN)
+                        )
+                else:
+                    if mask & (1 << one_step):
+                        moves.append(make_move_code(from_sq, one_step))
+                    two_step = one_step + direction * BOARD_SIZE
+                    if (
+                        r == start_row
+                        and not occupied & (1 << two_step)
+                        and mask & (1 << two_step)
+                    ):
+                        moves.append(
+                            make_move_code(from_sq, two_step, MOVE_DOUBLE_PUSH)
+                        )
+            attacks = PAWN_ATTACKS[us][from_sq]
+            for to_sq in _iter_bits(attacks & enemy & mask):
+                if r + direction == promo_row:
+                    moves.append(make_move_code(from_sq, to_sq, MOVE_PROMOTION, QUEEN))
+                else:
+                    moves.append(make_move_code(from_sq, to_sq))
+            if attacks & ep_bit:
+                move = make_move_code(from_sq, self.ep_square, MOVE_EN_PASSANT)
+                if self.is_legal_after_pseudo_move(move):
+                    moves.append(move)
+
+        for ptype in (KNIGHT, BISHOP, ROOK, QUEEN):
+            for from_sq in _iter_bits(self.pieces[base + ptype]):
+                mask = target_mask & ~own
+                if from_sq in pins:
+                    mask &= pins[from_sq]
+                for to_sq in _iter_bits(piece_attacks(ptype, from_sq, occupied) & mask):
+                    moves.append(make_move_code(from_sq, to_sq))
+
+        if not checkers:
+            for move in self._generate_castling_moves():
+                if self.is_legal_after_pseudo_move(move):
+                    moves.append(move)
+        return moves
+
+    def generate_legal_moves_by_filter(self):
+        # Referenz: pseudolegale Züge ausführen und auf Schach prüfen
+        us = self.side
+        legal_moves = []
+        for move in self.generate_pseudo_legal_moves():
+            self.make_move(move)
+            if not self.in_check(us):
+                legal_moves.append(move)
+            self.unmake_move()
+        return legal_moves
+
+    # --- Zug ausführen und zurücknehmen ---
+    def after(self, move):
+        child = self.copy()
+        child.make_move(move)
+        return child
+
+    def make_move(self, move):
+        us = self.side
+        them = 1 - us
+        from_sq = move_from(move)
+        to_sq = move_to(move)
+        flag = move_flag(move)
+        moved = CODE_TYPE[self.squares[from_sq]]
+        captured = None
+        previous_key = self.key
+
+        if flag == MOVE_CASTLE:
+            castle = self.variant.castle_by_target[(us, to_sq)]
+            self._remove(us, KING, castle[2])
+            self._remove(us, ROOK, castle[4])
+            self._put(us, KING, castle[3])
+            self._put(us, ROOK, castle[5])
+        else:
+            if flag == MOVE_EN_PASSANT:
+                captured = PAWN
+                self._remove(them, PAWN, _en_passant_victim(to_sq, us))
+            else:
+                target = self.squares[to_sq]
+                if target:
+                    captured = CODE_TYPE[target]
+                    self._remove(them, captured, to_sq)
+            self._remove(us, moved, from_sq)
+            if flag == MOVE_PROMOTION:
+                self._put(us, move_promotion(move), to_sq)
+            else:
+                self._put(us, moved, to_sq)
+
+        self.undo_stack.append(
+            (
+                move,
+                moved,
+                captured,
+                self.ep_square,
+                self.castling,
+                previous_key,
+                self.halfmove_clock,
+            )
+        )
+        self.key_history.append(previous_key)
+        if moved == PAWN or captured is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        self.key ^= _ep_key(self.ep_square) ^ ZOBRIST_CASTLING[self.castling]
+        self.ep_square = (from_sq + to_sq) // 2 if flag == MOVE_DOUBLE_PUSH else None
+        if moved == KING:
+            self.castling &= ~(0b0011 if us == WHITE else 0b1100)
+        elif moved == ROOK:
+            self.castling &= ~(
+                self.variant.rights_cleared_from[from_sq]
+                & (0b0011 if us == WHITE else 0b1100)
+            )
+        self.key ^= (
+            _ep_key(self.ep_square) ^ ZOBRIST_CASTLING[self.castling] ^ ZOBRIST_SIDE
+        )
+        self.side = them
+
+    def make_null_move(self):
+        # Zugrecht abgeben, für das Nullzug-Pruning; im Schach nicht erlaubt.
+        # unmake_move nimmt ihn wie einen normalen Zug zurück.
+        self.undo_stack.append(
+            (
+                None,
+                None,
+                None,
+                self.ep_square,
+                self.castling,
+                self.key,
+                self.halfmove_clock,
+            )
+        )
+        self.key_history.append(self.key)
+        # Über einen Nullzug hinweg gibt es keine Wiederholung
+        self.halfmove_clock = 0
+        self.key ^= _ep_key(self.ep_square) ^ ZOBRIST_SIDE
+        self.ep_square = None
+        self.side = 1 - self.side
+
+    def repetitions(self):
+        # Wie oft die aktuelle Stellung schon vorkam; nur Stellungen mit derselben
+        # Seite am Zug und ohne Bauern- oder Schlagzug dazwischen kommen in Frage
+        history = self.key_history
+        count = 0
+        for back in range(2, min(self.halfmove_clock, len(history)) + 1, 2):
+            if history[-back] == self.key:
+                count += 1
+        return count
+
+    def is_draw_by_rule(self, repetitions=2, no_progress_plies=NO_PROGRESS_PLIES):
+        # repetitions=2: schon die erste Wiederholung zählt (in der Suche),
+        # 3 entspricht der dreifachen Stellungswiederholung der Partie
+        if no_progress_plies is not None and self.halfmove_clock >= no_progress_plies:
+            return True
+        return self.repetitions() + 1 >= repetitions
+
+    def has_non_pawn_material(self, color):
+        base = color * 6
+        return bool(
+            self.pieces[base + KNIGHT]
+            | self.pieces[base + BISHOP]
+            | self.pieces[base + ROOK]
+            | self.pieces[base + QUEEN]
+        )
+
+    def unmake_move(self):
+        move, moved, captured, ep_square, castling, key, halfmove_clock = (
+            self.undo_stack.pop()
+        )
+        self.key_history.pop()
+        self.halfmove_clock = halfmove_clock
+        them = self.side
+        us = 1 - them
+        if move is None:  # Nullzug
+            self.ep_square = ep_square
+            self.key = key
+            self.side = us
+            return
+        from_sq = move_from(move)
+        to_sq = move_to(move)
+        flag = move_flag(move)
+
+        if flag == MOVE_CASTLE:
+            castle = self.variant.castle_by_target[(us, to_sq)]
+            self._remove(us, KING, castle[3])
+            self._remove(us, ROOK, castle[5])
+            self._put(us, KING, castle[2])
+            self._put(us, ROOK, castle[4])
+        else:
+            if flag == MOVE_PROMOTION:
+                self._remove(us, move_promotion(move), to_sq)
+            else:
+                self._remove(us, moved, to_sq)
+            self._put(us, moved, from_sq)
+            if flag == MOVE_EN_PASSANT:
+                self._put(them, PAWN, _en_passant_victim(to_sq, us))
+            elif captured is not None:
+                self._put(them, captured, to_sq)
+
+        self.ep_square = ep_square
+        self.castling = castling
+        self.key = key
+        self.side = us
+
+
+def _captured_type(pos, move):
+    if move_flag(move) == MOVE_EN_PASSANT:
+        return PAWN
+    if move_flag(move) == MOVE_CASTLE:
+        return None
+    target = pos.squares[move_to(move)]
+    return CODE_TYPE[target] if target else None
+
+
+def _en_passant_victim(to_sq, color):
+    # Der geschlagene Bauer steht hinter dem Zielfeld, aus Sicht des Schlagenden
+    return to_sq + BOARD_SIZE if color == WHITE else to_sq - BOARD_SIZE
+
+
+# --- Übersetzung in das Zugformat der GUI ((r, c), (r, c[, "O-O"])) ---
+def move_to_tuple(pos, move):
+    start = square_coords(move_from(move))
+    end = square_coords(move_to(move))
+    if move_flag(move) == MOVE_CASTLE:
+        castle = pos.variant.castle_by_target[(pos.side, move_to(move))]
+        return start, (end[0], end[1], castle[8])
+    return start, end
+
+
+def tuple_to_move(pos, start_pos, end_tuple):
+    for move in pos.generate_legal_moves():
+        if move_to_tuple(pos, move) == (start_pos, tuple(end_tuple)):
+            return move
+    return None
+
+
+# --- Textnotation: FEN für 6x6 und Züge in Koordinatenschreibweise ---
+# Linien a-f entsprechen den Spalten 0-5, Reihe 1 ist die weiße Grundreihe (r = 5).
+FILES = "abcdef"
+_FEN_CASTLING = "KQkq"  # gleiche Reihenfolge wie CASTLING_KEYS
+
+
+def square_name(sq):
+    r, c = square_coords(sq)
+    return FILES[c] + str(BOARD_SIZE - r)
+
+
+def parse_square(name):
+    if len(name) != 2 or name[0] not in FILES or not name[1].isdigit():
+        raise ValueError(f"Ungültiges Feld: {name}")
+    r = BOARD_SIZE - int(name[1])
+    if not 0 <= r < BOARD_SIZE:
+        raise ValueError(f"Ungültiges Feld: {name}")
+    return square_index(r, FILES.index(name[0]))
+
+
+def position_from_fen(variant, fen):
+    fields = fen.split()
+    if len(fields) < 2:
+        raise ValueError(f"Unvollständige FEN: {fen}")
+    rows = fields[0].split("/")
+    if len(rows) != BOARD_SIZE:
+        raise ValueError(f"FEN braucht {BOARD_SIZE} Reihen: {fen}")
+    board = []
+    for row_text in rows:
+        row = []
+        for char in row_text:
+            if char.isdigit():
+                row.extend([None] * int(char))
+            elif char.upper() in PIECE_LETTERS:
+                row.append(("w" if char.isupper() else "b") + char.upper())
+            else:
+                raise ValueError(f"Unbekannte Figur in FEN: {char}")
+        if len(row) != BOARD_SIZE:
+            raise ValueError(f"FEN-Reihe hat nicht {BOARD_SIZE} Felder: {row_text}")
+        board.append(row)
+    side = {"w": "white", "b": "black"}.get(fields[1])
+    if side is None:
+        raise ValueError(f"Ungültige Seite am Zug: {fields[1]}")
+    castling_text = fields[2] if len(fields) > 2 else "-"
+    castling_rights = {
+        key: letter in castling_text
+        for key, letter in zip(CASTLING_KEYS, _FEN_CASTLING)
+    }
+    ep_text = fields[3] if len(fields) > 3 else "-"
+    ep_target = None if ep_text == "-" else square_coords(parse_square(ep_text))
+    return Position.from_state(variant, board, ep_target, castling_rights, side)
+
+
+def position_to_fen(pos):
+    board = pos.to_state()[0]
+    rows = []
+    for row in board:
+        row_text = ""
+        empty = 0
+        for piece in row:
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                row_text += str(empty)
+                empty = 0
+            row_text += piece[1] if piece[0] == "w" else piece[1].lower()
+        if empty:
+            row_text += str(empty)
+        rows.append(row_text)
+    castling_text = "".join(
+        letter for i, letter in enumerate(_FEN_CASTLING) if pos.castling & (1 << i)
+    )
+    ep_text = square_name(pos.ep_square) if pos.ep_square is not None else "-"
+    return f"{'/'.join(rows)} {'wb'[pos.side]} {castling_text or '-'} {ep_text}"
+
+
+def move_to_text(move):
+    text = square_name(move_from(move)) + square_name(move_to(move))
+    if move_flag(move) == MOVE_PROMOTION:
+        text += PIECE_LETTERS[move_promotion(move)].lower()
+    return text
+
+
+def text_to_move(pos, text):
+    # Liefert den legalen Zug zur Koordinatenschreibweise oder None.
+    # Unterverwandlungen werden aus dem Damenumwandlungszug abgeleitet.
+    text = text.strip().lower()
+    promotion = PIECE_LETTERS.index(text[4].upper()) if len(text) == 5 else QUEEN
+    for move in pos.generate_legal_moves():
+        if square_name(move_from(move)) + square_name(move_to(move)) != text[:4]:
+            continue
+        if move_flag(move) == MOVE_PROMOTION:
+            return make_move_code(
+                move_from(move), move_to(move), MOVE_PROMOTION, promotion
+            )
+        return move
+    return None
+
+
+# --- Perft: Blattzählung zur Prüfung des Zuggenerators ---
+def perft(pos, depth):
+    if depth == 0:
+        return 1
+    moves = pos.generate_legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        pos.make_move(move)
+        nodes += perft(pos, depth - 1)
+        pos.unmake_move()
+    return nodes
+
+
+def perft_divide(pos, depth):
+    # Knotenzahl je Wurzelzug, zum Eingrenzen von Abweichungen
+    counts = []
+    for move in pos.generate_legal_moves():
+        pos.make_move(move)
+        counts.append((move, perft(pos, depth - 1)))
+        pos.unmake_move()
+    return counts
+
+
+# --- Bewertung ---
+MOBILITY_PIECES = (KNIGHT, BISHOP, ROOK, QUEEN)
+MOBILITY_WEIGHT = 0.1  # je erreichbarem Feld, ein Bauer ist 10 (wie in der GUI)
+
+
+class MobilityCache:
+    # Mobilität je Zobrist-Schlüssel; Index = Schlüssel modulo Größe, immer ersetzen
+    def __init__(self, size=1 << 16, weight=MOBILITY_WEIGHT):
+        self.size = size
+        self.weight = weight
+        self.keys = [None] * size
+        self.values = [0] * size
+        self.hits = 0
+        self.misses = 0
+
+    def mobility(self, pos):
+        index = pos.key % self.size
+        if self.keys[index] == pos.key:
+            self.hits += 1
+            return self.values[index]
+        self.misses += 1
+        value = pos.mobility()
+        self.keys[index] = pos.key
+        self.values[index] = value
+        return value
+
+
+def evaluate(pos, ai_color, mobility_cache=None):
+    # Material und Figur-Feld-Tabellen werden in make/unmake mitgeführt (pos.score),
+    # die Mobilität kommt aus den Angriffs-Bitboards und wird je Stellung gecacht.
+    # Gerundet, damit Scores ganzzahlig bleiben (Nullfenster der PVS)
+    score = pos.score
+    if mobility_cache is not None:
+        score += round(mobility_cache.mobility(pos) * mobility_cache.weight)
+    return score if ai_color == WHITE else -score
+
+
+# --- Transpositionstabelle ---
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    # Feste Anzahl Einträge; Index = Schlüssel modulo Größe.
+    # replacement: "depth" behält tiefere Einträge der laufenden Suche,
+    # "always" überschreibt jeden Eintrag.
+    def __init__(self, size=1 << 18, replacement="depth"):
+        if replacement not in ("depth", "always"):
+            raise ValueError(f"Unbekanntes Ersetzungsschema: {replacement}")
+        self.size = size
+        self.replacement = replacement
+        self.generation = 0
+        self.entries = [None] * size
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        index = key % self.size
+        old = self.entries[index]
+        if (
+            self.replacement == "always"
+            or old is None
+            or old[0] == key
+            or old[5] != self.generation
+            or depth >= old[1]
+        ):
+            # (Schlüssel, Tiefe, Score, Schranke, bester Zug, Generation)
+            self.entries[index] = (key, depth, score, flag, move, self.generation)
+
+
+def _tt_score_for_ai(pos, score, flag, ai_color):
+    # Die Tabelle speichert Scores aus Sicht der Seite am Zug; minimax rechnet aus
+    # Sicht der KI. Beim Vorzeichenwechsel tauschen untere und obere Schranke.
+    if pos.side == ai_color:
+        return score, flag
+    if flag == TT_EXACT:
+        return -score, flag
+    return -score, TT_UPPER if flag == TT_LOWER else TT_LOWER
+
+
+# --- Zugsortierung ---
+# Reihenfolge: Hash-/PV-Zug, Schlagzüge nach MVV-LVA, Umwandlungen, Killerzüge,
+# ruhige Züge nach History-Tabelle, zuletzt Schlagzüge mit negativer SEE.
+ORDER_HASH_MOVE = 1_000_000
+ORDER_CAPTURE = 100_000
+ORDER_PROMOTION = 90_000
+ORDER_KILLER = 80_000
+ORDER_LOSING_CAPTURE = -100_000
+HISTORY_LIMIT = 50_000  # darüber werden alle History-Werte halbiert
+KILLERS_PER_PLY = 2
+# Delta-Pruning in der Ruhesuche: Schlagzüge, die selbst mit diesem Puffer
+# alpha nicht erreichen, werden übersprungen
+DELTA_MARGIN = 20
+# Bauern einen Schritt vor der Umwandlung, je Farbe; mit ihnen kann ein Schlagzug
+# zusätzlich den Umwandlungsgewinn bringen
+PRE_PROMOTION_ROWS = [
+    _bitboard(square_index(1, c) for c in range(BOARD_SIZE)),
+    _bitboard(square_index(BOARD_SIZE - 2, c) for c in range(BOARD_SIZE)),
+]
+# Der König hat in PIECE_VALUES den Wert 0; als Angreifer soll er zuletzt kommen
+_ATTACKER_VALUES = PIECE_VALUES[:KING] + (100,)
+# Halbe Breite des Aspirationsfensters um den Score der vorigen Iteration (PVS);
+# schlägt es fehl, wird die betroffene Seite vervierfacht, dann ganz geöffnet
+ASPIRATION_WINDOW = 15
+ASPIRATION_RETRIES = 2
+# Selektive Suche (nur im PVS-Modus). Nullzug: Reduktion R und Mindesttiefe;
+# in reinen Bauernendspielen (Zugzwang) wird kein Nullzug versucht.
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+# Späte Zugreduktion: ruhige Züge ab dem LMR_FULL_DEPTH_MOVES-ten Zug eine Tiefe
+# flacher, ab LMR_DEEP_MOVES zwei; schlägt die reduzierte Suche alpha, wird
+# sie mit voller Tiefe bestätigt.
+LMR_FULL_DEPTH_MOVES = 3
+LMR_DEEP_MOVES = 8
+LMR_MIN_DEPTH = 3
+
+
+class SearchTimeout(Exception):
+    # Zeitlimit abgelaufen oder Suche über das stop_event abgebrochen
+    pass
+
+
+# --- Suchstatistik ---
+# Index des Zugs mit Beta-Schnitt, der letzte Eintrag sammelt den Rest
+CUTOFF_HISTOGRAM_SLOTS = 8
+SEARCH_COUNTERS = (
+    "draws",
+    "tb_hits",
+    "see_pruned",
+    "pvs_researches",
+    "aspiration_researches",
+    "null_move_cutoffs",
+    "lmr_reductions",
+    "lmr_researches",
+)
+
+
+class SearchStats:
+    # Kennzahlen einer Suche: Search trägt jede fertige Tiefe ein, finish()
+    # übernimmt am Ende die Zähler. to_dict() ist JSON-fähig.
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.seconds = 0.0
+        self.depth = 0
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.cutoff_histogram = [0] * CUTOFF_HISTOGRAM_SLOTS
+        self.iterations = []  # je Tiefe: Knoten, Zeit, Score und Hauptvariante
+        self.counters = {}
+
+    def record_iteration(self, search, depth, score, pv, seconds):
+        nodes = search.nodes + search.qnodes
+        previous_nodes = sum(iteration["nodes"] for iteration in self.iterations)
+        previous_seconds = (
+            self.iterations[-1]["total_seconds"] if self.iterations else 0
+        )
+        self.iterations.append(
+            {
+                "depth": depth,
+                "score": score,
+                "nodes": nodes - previous_nodes,
+                "seconds": round(seconds - previous_seconds, 4),
+                "total_seconds": round(seconds, 4),
+                "pv": [move_to_text(move) for move in pv],
+            }
+        )
+
+    def finish(self, search):
+        self.seconds = time.perf_counter() - self.start_time
+        self.depth = search.current_depth
+        self.nodes = search.nodes
+        self.qnodes = search.qnodes
+        self.tt_probes = search.tt_probes
+        self.tt_hits = search.tt_hits
+        self.cutoffs = search.cutoffs
+        self.cutoff_histogram = search.cutoff_histogram[:]
+        self.counters = {name: getattr(search, name) for name in SEARCH_COUNTERS}
+
+    def finish_parallel(self, parallel):
+        # Für ParallelSearch: die Arbeitsprozesse melden nur ihre Knoten (samt
+        # Ruhesuche), TT- und Schnittzähler bleiben in den Prozessen
+        self.seconds = time.perf_counter() - self.start_time
+        self.nodes = parallel.nodes
+        previous_nodes, previous_seconds = 0, 0
+        for depth, score, move, seconds, nodes in parallel.iterations:
+            self.iterations.append(
+                {
+                    "depth": depth,
+                    "score": score,
+                    "nodes": nodes - previous_nodes,
+                    "seconds": round(seconds - previous_seconds, 4),
+                    "total_seconds": round(seconds, 4),
+                    "pv": [move_to_text(move)],
+                }
+            )
+            previous_nodes, previous_seconds = nodes, seconds
+            self.depth = depth
+
+    @property
+    def nps(self):
+        return int((self.nodes + self.qnodes) / self.seconds) if self.seconds else 0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.cutoff_histogram[0] / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def branching_factor(self):
+        # Effektiver Verzweigungsfaktor: mittleres Knotenverhältnis aufeinander
+        # folgender Tiefen, bei nur einer Tiefe die Tiefe-te Wurzel der Knoten
+        ratios = [
+            current["nodes"] / previous["nodes"]
+            for previous, current in zip(self.iterations, self.iterations[1:])
+            if previous["nodes"]
+        ]
+        if ratios:
+            return sum(ratios) / len(ratios)
+        if self.depth and self.nodes:
+            return self.nodes ** (1.0 / self.depth)
+        return 0.0
+
+    def to_dict(self):
+        return {
+            "nodes": self.nodes,
+            "qnodes": self.qnodes,
+            "seconds": round(self.seconds, 4),
+            "depth": self.depth,
+            "nps": self.nps,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": round(self.tt_hit_rate, 4),
+            "cutoffs": self.cutoffs,
+            "cutoff_histogram": self.cutoff_histogram,
+            "first_move_cutoff_rate": round(self.first_move_cutoff_rate, 4),
+            "branching_factor": round(self.branching_factor, 2),
+            "iterations": self.iterations,
+            **self.counters,
+        }
+
+    def summary(self):
+        return (
+            f"Tiefe {self.depth}, {self.nodes + self.qnodes} Knoten "
+            f"(Ruhesuche {self.qnodes}) in {self.seconds:.2f}s, {self.nps} Knoten/s\n"
+            f"TT {self.tt_hits}/{self.tt_probes} ({self.tt_hit_rate:.0%}), "
+            f"Schnitte {self.cutoffs} (erster Zug {self.first_move_cutoff_rate:.0%}), "
+            f"Verzweigung {self.branching_factor:.1f}"
+        )
+
+
+class Search:
+    # Bündelt den Zustand einer KI-Suche: Farbe der KI, Transpositionstabelle,
+    # Zeitlimit und die Hauptvariante der letzten abgeschlossenen Iteration.
+    # stop_event (z.B. threading.Event) bricht die Suche aus einem anderen Thread ab.
+    TIME_CHECK_INTERVAL = 64  # Knoten zwischen zwei Blicken auf die Uhr
+
+    def __init__(
+        self,
+        ai_color,
+        tt=None,
+        quiescence=True,
+        stop_event=None,
+        mobility=True,
+        mobility_weight=MOBILITY_WEIGHT,
+        pvs=False,
+        null_move=False,
+        lmr=False,
+        no_progress_plies=NO_PROGRESS_PLIES,
+        see=True,
+        tablebase=None,
+    ):
+        self.ai_color = ai_color
+        # pvs=True: Negamax mit Nullfenstern und Aspirationsfenstern statt minimax;
+        # null_move und lmr wirken nur dort
+        self.pvs = pvs
+        self.null_move = null_move
+        self.lmr = lmr
+        # Remis in der Suche: erste Wiederholung auf Pfad oder in der Partie, oder
+        # so viele Halbzüge ohne Fortschritt (None: keine Zählregel)
+        self.no_progress_plies = no_progress_plies
+        self.draws = 0
+        # see=True: verlierende Schlagzüge nach hinten sortieren und in der
+        # Ruhesuche auslassen
+        self.see_enabled = see
+        self.see_pruned = 0
+        # Endspieldatenbank (Tablebase) für Stellungen mit drei Steinen
+        self.tablebase = tablebase
+        self.tb_hits = 0
+        self.tt = tt
+        self.quiescence_enabled = quiescence
+        self.mobility_cache = (
+            MobilityCache(weight=mobility_weight) if mobility else None
+        )
+        self.stop_event = stop_event
+        self.deadline = None
+        self.node_limit = None
+        # Grenzen der laufenden Vertiefung; ponder_hit() setzt sie aus einem anderen
+        # Thread neu, während die Suche weiterläuft
+        self.start_time = None
+        self.time_budget_ms = None
+        self.max_depth = None
+        self.pondering = False
+        # Optionaler prozessübergreifender Knotenzähler (multiprocessing.Value)
+        self.shared_nodes = None
+        self.current_depth = 0
+        self.nodes = 0
+        self.qnodes = 0
+        self.pv_hint = {}  # Schlüssel -> Zug der vorherigen Hauptvariante
+        self.iterations = []  # (Tiefe, Score, Hauptvariante, Sekunden)
+        # Optional: wird nach jeder abgeschlossenen Tiefe mit (search, Tiefe, Score,
+        # Hauptvariante, Sekunden) aufgerufen, z.B. für info-Zeilen
+        self.on_iteration = None
+        self.killers = []  # je Ply die letzten ruhigen Züge mit Beta-Schnitt
+        # Butterfly-Tabelle je Farbe, Index = die unteren 12 Bit des Zugs (von, nach)
+        self.history = [[0] * (1 << 12) for _ in range(2)]
+        self.cutoffs = 0
+        self.cutoff_histogram = [0] * CUTOFF_HISTOGRAM_SLOTS
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.stats = SearchStats()
+        self.pvs_researches = 0  # Nullfenster-Suchen, die voll wiederholt wurden
+        self.aspiration_researches = 0
+        self.null_move_cutoffs = 0
+        self.lmr_reductions = 0
+        self.lmr_researches = 0  # reduzierte Züge, die voll bestätigt werden mussten
+
+    # --- Zugsortierung ---
+    def order_moves(self, pos, moves, hash_move, ply):
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history[pos.side]
+        scored = []
+        for move in moves:
+            if move == hash_move:
+                score = ORDER_HASH_MOVE
+            else:
+                victim = _captured_type(pos, move)
+                if victim is not None:
+                    attacker = CODE_TYPE[pos.squares[move_from(move)]]
+                    score = (
+                        ORDER_CAPTURE
+                        + PIECE_VALUES[victim] * 100
+                        - _ATTACKER_VALUES[attacker]
+                    )
+                    if (
+                        self.see_enabled
+                        and _ATTACKER_VALUES[attacker] > PIECE_VALUES[victim]
+                        and move_flag(move) != MOVE_PROMOTION
+                    ):
+                        exchange = pos.see(move)
+                        if exchange < 0:
+                            score = ORDER_LOSING_CAPTURE + exchange
+                elif move_flag(move) == MOVE_PROMOTION:
+                    score = ORDER_PROMOTION
+                elif move in killers:
+                    score = ORDER_KILLER - killers.index(move)
+                else:
+                    score = history[move & 0xFFF]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def _record_cutoff(self, pos, move, move_index, depth, ply):
+        self.cutoffs += 1
+        self.cutoff_histogram[min(move_index, CUTOFF_HISTOGRAM_SLOTS - 1)] += 1
+        if _captured_type(pos, move) is not None or move_flag(move) == MOVE_PROMOTION:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+        history = self.history[pos.side]
+        history[move & 0xFFF] += depth * depth
+        if history[move & 0xFFF] > HISTORY_LIMIT:
+            for color_history in self.history:
+                for i, value in enumerate(color_history):
+                    color_history[i] = value // 2
+
+    def _check_time(self):
+        if (self.nodes + self.qnodes) % self.TIME_CHECK_INTERVAL:
+            return
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.shared_nodes is not None:
+            with self.shared_nodes.get_lock():
+                self.shared_nodes.value += self.TIME_CHECK_INTERVAL
+                total_nodes = self.shared_nodes.value
+        else:
+            total_nodes = self.nodes + self.qnodes
+        if self.node_limit is not None and total_nodes >= self.node_limit:
+            raise SearchTimeout()
+
+    def minimax(self, pos, depth, alpha, beta, maximizing_player, ply=0):
+        self.nodes += 1
+        self._check_time()
+        if ply > 0 and pos.is_draw_by_rule(2, self.no_progress_plies):
+            self.draws += 1
+            return DRAW_SCORE, None
+        if ply > 0 and self.tablebase is not None:
+            score = self.tablebase.probe(pos)
+            if score is not None:
+                self.tb_hits += 1
+                return (score if pos.side == self.ai_color else -score), None
+
+        tt = self.tt
+        ai_color = self.ai_color
+        alpha_orig, beta_orig = alpha, beta
+        hash_move = self.pv_hint.get(pos.key)
+        if tt is not None:
+            self.tt_probes += 1
+            entry = tt.probe(pos.key)
+            if entry is not None:
+                self.tt_hits += 1
+                hash_move = hash_move or entry[4]
+                # Schranken nur für Schnitte, das Fenster bleibt unverändert, damit
+                # die Schranke beim Speichern zum tatsächlich gesuchten Fenster
+                # passt. Nicht an der Wurzel: dort zählt die Partiehistorie.
+                if ply > 0 and entry[1] >= depth:
+                    score, flag = _tt_score_for_ai(pos, entry[2], entry[3], ai_color)
+                    if (
+                        flag == TT_EXACT
+                        or (flag == TT_LOWER and score >= beta)
+                        or (flag == TT_UPPER and score <= alpha)
+                    ):
+                        return score, entry[4]
+
+        possible_moves = pos.generate_legal_moves()
+
+        if depth == 0 or not possible_moves:
+            if not possible_moves:
+                if pos.in_check():
+                    return (
+                        -CHECKMATE_SCORE if maximizing_player else CHECKMATE_SCORE
+                    ), None
+                return STALEMATE_SCORE, None
+            if not self.quiescence_enabled:
+                return evaluate(pos, ai_color, self.mobility_cache), None
+            # Die Ruhesuche rechnet aus Sicht der Seite am Zug
+            if pos.side == ai_color:
+                return self.quiescence(pos, alpha, beta, ply), None
+            return -self.quiescence(pos, -beta, -alpha, ply), None
+
+        possible_moves = self.order_moves(pos, possible_moves, hash_move, ply)
+        best_move_at_this_depth = None
+        if maximizing_player:
+            max_eval = -float("inf")
+            for move_index, move in enumerate(possible_moves):
+                pos.make_move(move)
+                eval_score, _ = self.minimax(
+                    pos, depth - 1, alpha, beta, False, ply + 1
+                )
+                pos.unmake_move()
+                if eval_score > max_eval:
+                    max_eval = eval_score
+                    best_move_at_this_depth = move
+                alpha = max(alpha, eval_score)
+                if beta <= alpha:
+                    self._record_cutoff(pos, move, move_index, depth, ply)
+                    break
+            self._tt_store(
+                pos, depth, max_eval, alpha_orig, beta_orig, best_move_at_this_depth
+            )
+            return max_eval, best_move_at_this_depth
+        else:
+            min_eval = float("inf")
+            for move_index, move in enumerate(possible_moves):
+                pos.make_move(move)
+                eval_score, _ = self.minimax(pos, depth - 1, alpha, beta, True, ply + 1)
+                pos.unmake_move()
+                if eval_score < min_eval:
+                    min_eval = eval_score
+                    best_move_at_this_depth = move
+                beta = min(beta, eval_score)
+                if beta <= alpha:
+                    self._record_cutoff(pos, move, move_index, depth, ply)
+                    break
+            self._tt_store(
+                pos, depth, min_eval, alpha_orig, beta_orig, best_move_at_this_depth
+            )
+            return min_eval, best_move_at_this_depth
+
+    def negamax(self, pos, depth, alpha, beta, ply=0, allow_null=True):
+        # Principal Variation Search: der erste Zug mit vollem Fenster, alle
+        # weiteren mit Nullfenster; nur wer darüber liegt, wird voll nachgesucht.
+        # Scores aus Sicht der Seite am Zug.
+        self.nodes += 1
+        self._check_time()
+        if ply > 0 and pos.is_draw_by_rule(2, self.no_progress_plies):
+            self.draws += 1
+            return DRAW_SCORE, None
+        if ply > 0 and self.tablebase is not None:
+            score = self.tablebase.probe(pos)
+            if score is not None:
+                self.tb_hits += 1
+                return score, None
+
+        tt = self.tt
+        alpha_orig, beta_orig = alpha, beta
+        hash_move = self.pv_hint.get(pos.key)
+        if tt is not None:
+            self.tt_probes += 1
+            entry = tt.probe(pos.key)
+            if entry is not None:
+                self.tt_hits += 1
+                hash_move = hash_move or entry[4]
+                # wie in minimax: nur Schnitte, nicht an der Wurzel
+                if ply > 0 and entry[1] >= depth:
+                    score, flag = entry[2], entry[3]
+                    if (
+                        flag == TT_EXACT
+                        or (flag == TT_LOWER and score >= beta)
+                        or (flag == TT_UPPER and score <= alpha)
+                    ):
+                        return score, entry[4]
+
+        possible_moves = pos.generate_legal_moves()
+        in_check = pos.in_check()
+        if not possible_moves:
+            if in_check:
+                return -CHECKMATE_SCORE, None
+            return STALEMATE_SCORE, None
+        if depth <= 0:
+            if not self.quiescence_enabled:
+                return evaluate(pos, pos.side, self.mobility_cache), None
+            return self.quiescence(pos, alpha, beta, ply), None
+
+        if (
+            self.null_move
+            and allow_null
+            and ply > 0
+            and depth >= NULL_MOVE_MIN_DEPTH
+            and not in_check
+            and beta < CHECKMATE_SCORE
+            and pos.has_non_pawn_material(pos.side)
+            and evaluate(pos, pos.side, self.mobility_cache) >= beta
+        ):
+            # Steht die Seite am Zug selbst nach einem ausgelassenen Zug noch über
+            # beta, lohnt sich die volle Suche nicht
+            pos.make_null_move()
+            score = -self.negamax(
+                pos,
+                depth - 1 - NULL_MOVE_REDUCTION,
+                -beta,
+                -beta + 1,
+                ply + 1,
+                allow_null=False,
+            )[0]
+            pos.unmake_move()
+            if score >= beta:
+                self.null_move_cutoffs += 1
+                return (beta if score >= CHECKMATE_SCORE else score), None
+
+        possible_moves = self.order_moves(pos, possible_moves, hash_move, ply)
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        best_score = -float("inf")
+        best_move = None
+        for move_index, move in enumerate(possible_moves):
+            reduction = 0
+            if (
+                self.lmr
+                and move_index >= LMR_FULL_DEPTH_MOVES
+                and depth >= LMR_MIN_DEPTH
+                and not in_check
+                and move not in killers
+                and move_flag(move) != MOVE_PROMOTION
+                and _captured_type(pos, move) is None
+            ):
+                reduction = 2 if move_index >= LMR_DEEP_MOVES and depth > 3 else 1
+            pos.make_move(move)
+            if reduction and pos.in_check():
+                reduction = 0  # Schachgebote nicht reduzieren
+            if move_index == 0:
+                score = -self.negamax(pos, depth - 1, -beta, -alpha, ply + 1)[0]
+            else:
+                if reduction:
+                    self.lmr_reductions += 1
+                    score = -self.negamax(
+                        pos, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1
+                    )[0]
+                    if score > alpha:
+                        self.lmr_researches += 1
+                        score = -self.negamax(
+                            pos, depth - 1, -alpha - 1, -alpha, ply + 1
+                        )[0]
+                else:
+                    score = -self.negamax(pos, depth - 1, -alpha - 1, -alpha, ply + 1)[
+                        0
+                    ]
+                if alpha < score < beta:
+                    self.pvs_researches += 1
+                    score = -self.negamax(pos, depth - 1, -beta, -alpha, ply + 1)[0]
+            pos.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._record_cutoff(pos, move, move_index, depth, ply)
+                break
+        self._tt_store(
+            pos, depth, best_score, alpha_orig, beta_orig, best_move, side_relative=True
+        )
+        return best_score, best_move
+
+    def quiescence(self, pos, alpha, beta, ply):
+        # Negamax über Schlagzüge und Umwandlungen mit Stand-pat und Delta-Pruning.
+        # Im Schach gibt es kein Stand-pat, dann werden alle Ausweichzüge gesucht.
+        self.qnodes += 1
+        self._check_time()
+        if pos.in_check():
+            evasions = pos.generate_legal_moves()
+            if not evasions:
+                return -CHECKMATE_SCORE
+            for move in self.order_moves(pos, evasions, None, ply):
+                pos.make_move(move)
+                score = -self.quiescence(pos, -beta, -alpha, ply + 1)
+                pos.unmake_move()
+                if score >= beta:
+                    return score
+                alpha = max(alpha, score)
+            return alpha
+        stand_pat = evaluate(pos, pos.side, self.mobility_cache)
+        if stand_pat >= beta:
+            return stand_pat
+        best_gain = PIECE_VALUES[QUEEN]
+        if pos.pieces[pos.side * 6 + PAWN] & PRE_PROMOTION_ROWS[pos.side]:
+            best_gain += PIECE_VALUES[QUEEN] - PIECE_VALUES[PAWN]
+        if stand_pat + best_gain + DELTA_MARGIN < alpha:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        for move in self.order_moves(pos, pos.generate_captures(), None, ply):
+            victim = _captured_type(pos, move)
+            gain = PIECE_VALUES[victim] if victim is not None else 0
+            if move_flag(move) == MOVE_PROMOTION:
+                gain += PIECE_VALUES[QUEEN] - PIECE_VALUES[PAWN]
+            if stand_pat + gain + DELTA_MARGIN < alpha:
+                continue
+            if (
+                self.see_enabled
+                and victim is not None
+                and move_flag(move) != MOVE_PROMOTION
+                and _ATTACKER_VALUES[CODE_TYPE[pos.squares[move_from(move)]]]
+                > PIECE_VALUES[victim]
+                and pos.see(move) < 0
+            ):
+                self.see_pruned += 1
+                continue
+            if not pos.is_legal_after_pseudo_move(move):
+                continue
+            pos.make_move(move)
+            score = -self.quiescence(pos, -beta, -alpha, ply + 1)
+            pos.unmake_move()
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def _tt_store(
+        self, pos, depth, score, alpha_orig, beta_orig, best_move, side_relative=False
+    ):
+        # side_relative: score ist schon aus Sicht der Seite am Zug (negamax)
+        if self.tt is None:
+            return
+        if score <= alpha_orig:
+            flag = TT_UPPER
+        elif score >= beta_orig:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        if not side_relative:
+            score, flag = _tt_score_for_ai(pos, score, flag, self.ai_color)
+        self.tt.store(pos.key, depth, score, flag, best_move)
+
+    def _score_for_ai(self, pos, score):
+        return score if pos.side == self.ai_color else -score
+
+    def search_depth(self, pos, depth, guess=None):
+        # Eine Iteration mit fester Tiefe; Score aus Sicht der KI.
+        # Mit PVS und einem Schätzwert (Score der vorigen Iteration, Sicht der KI)
+        # wird zuerst in einem Aspirationsfenster darum gesucht.
+        self.current_depth = depth
+        if not self.pvs:
+            return self.minimax(
+                pos, depth, -float("inf"), float("inf"), pos.side == self.ai_color
+            )
+        if guess is None or abs(guess) >= CHECKMATE_SCORE:
+            score, move = self.negamax(pos, depth, -float("inf"), float("inf"))
+            return self._score_for_ai(pos, score), move
+        guess = self._score_for_ai(pos, guess)
+        lower = upper = ASPIRATION_WINDOW
+        for attempt in range(ASPIRATION_RETRIES + 1):
+            alpha, beta = guess - lower, guess + upper
+            if attempt == ASPIRATION_RETRIES:
+                alpha, beta = -float("inf"), float("inf")
+            score, move = self.negamax(pos, depth, alpha, beta)
+            if alpha < score < beta:
+                break
+            self.aspiration_researches += 1
+            if score <= alpha:
+                lower *= 4
+            else:
+                upper *= 4
+        return self._score_for_ai(pos, score), move
+
+    def principal_variation(self, pos, first_move, max_length):
+        # Folgt ab dem Wurzelzug den besten Zügen aus der Transpositionstabelle
+        pv = []
+        move = first_move
+        while move is not None and len(pv) < max_length:
+            if move not in pos.generate_legal_moves():
+                break
+            pv.append(move)
+            pos.make_move(move)
+            entry = self.tt.probe(pos.key) if self.tt is not None else None
+            move = entry[4] if entry is not None else None
+        for _ in pv:
+            pos.unmake_move()
+        return pv
+
+    def iterative_deepening(self, pos, max_depth, time_budget_ms=None, ponder=False):
+        # Vertieft Halbzug für Halbzug. Läuft das Zeitbudget ab, wird die laufende
+        # Iteration verworfen und der Zug der letzten vollständigen Tiefe geliefert.
+        # ponder=True: ohne Zeitbudget suchen, bis ponder_hit() oder stop_event kommt.
+        self.start_time = time.perf_counter()
+        self.time_budget_ms = None if ponder else time_budget_ms
+        self.max_depth = max_depth
+        self.pondering = ponder
+        undo_depth = len(pos.undo_stack)
+        best_score, best_move = None, None
+        depth = 0
+        while depth < self.max_depth:
+            depth += 1
+            # Die erste Tiefe läuft immer zu Ende, damit es einen Zug gibt
+            if self.time_budget_ms is not None and depth > 1:
+                self.deadline = self.start_time + self.time_budget_ms / 1000.0
+                if time.perf_counter() >= self.deadline:
+                    break
+            self.current_depth = depth
+            try:
+                score, move = self.search_depth(pos, depth, best_score)
+            except SearchTimeout:
+                while len(pos.undo_stack) > undo_depth:
+                    pos.unmake_move()
+                break
+            finally:
+                self.deadline = None
+            best_score, best_move = score, move
+            pv = self.principal_variation(pos, move, depth)
+            self.iterations.append(
+                (depth, score, pv, time.perf_counter() - self.start_time)
+            )
+            self.stats.record_iteration(self, *self.iterations[-1])
+            if self.on_iteration is not None:
+                self.on_iteration(self, *self.iterations[-1])
+            self.pv_hint = {}
+            for pv_move in pv:
+                self.pv_hint[pos.key] = pv_move
+                pos.make_move(pv_move)
+            for _ in pv:
+                pos.unmake_move()
+            if move is None or abs(score) >= CHECKMATE_SCORE:
+                break
+        self.stats.finish(self)
+        return best_score, best_move
+
+    def ponder_hit(self, time_budget_ms=None, max_depth=None):
+        # Der erwartete Zug wurde gespielt: die Ponder-Suche läuft weiter, ab jetzt
+        # mit den normalen Grenzen. Das Zeitbudget zählt ab diesem Aufruf.
+        self.pondering = False
+        if max_depth is not None:
+            self.max_depth = max_depth
+            if self.current_depth > max_depth:
+                # Tiefe max_depth ist schon fertig, die laufende Iteration verwerfen
+                self.deadline = time.perf_counter()
+        if time_budget_ms is not None:
+            self.start_time = time.perf_counter()
+            self.time_budget_ms = time_budget_ms
+            if self.current_depth > 1:
+                self.deadline = self.start_time + time_budget_ms / 1000.0
+
+
+# --- Eröffnungsbuch ---
+# Binärformat: Kopf (Kennung, Version, Anzahl), danach nach Schlüssel sortierte
+# Einträge (Zobrist-Schlüssel, Zug, Score aus Sicht der Seite am Zug, Suchtiefe).
+# Die Schlüssel hängen an den Zobrist-Tabellen oben; ändern die sich, muss das
+# Buch mit schach_buch.py neu gebaut werden.
+BOOK_MAGIC = b"SB6X"
+BOOK_VERSION = 1
+_BOOK_HEADER = struct.Struct("<4sHxxI")
+_BOOK_ENTRY = struct.Struct("<QIhH")
+
+
+class OpeningBook:
+    def __init__(self):
+        self.keys = []  # sortiert, für bisect
+        self.entries = []  # (Zug, Score, Tiefe) parallel zu keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key, move, score, depth):
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            self.entries[index] = (move, score, depth)
+        else:
+            self.keys.insert(index, key)
+            self.entries.insert(index, (move, score, depth))
+
+    def lookup(self, key):
+        index = bisect.bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            return self.entries[index]
+        return None
+
+    def probe(self, pos):
+        # Buchzug für die Stellung oder None; der Zug wird gegen die legalen Züge
+        # geprüft, falls sich zwei Stellungen einen Schlüssel teilen
+        entry = self.lookup(pos.key)
+        if entry is None or entry[0] not in pos.generate_legal_moves():
+            return None
+        return entry[0]
+
+    def save(self, path):
+        with open(path, "wb") as book_file:
+            book_file.write(_BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, len(self)))
+            for key, (move, score, depth) in zip(self.keys, self.entries):
+                book_file.write(_BOOK_ENTRY.pack(key, move, score, depth))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as book_file:
+            data = book_file.read()
+        magic, version, count = _BOOK_HEADER.unpack_from(data)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"Kein Eröffnungsbuch (Version {BOOK_VERSION}): {path}")
+        if len(data) != _BOOK_HEADER.size + count * _BOOK_ENTRY.size:
+            raise ValueError(f"Eröffnungsbuch unvollständig: {path}")
+        book = cls()
+        for key, move, score, depth in _BOOK_ENTRY.iter_unpack(
+            data[_BOOK_HEADER.size :]
+        ):
+            book.keys.append(key)
+            book.entries.append((move, score, depth))
+        return book
+
+
+# --- Endspieldatenbanken (KQK, KRK, KPK) ---
+# Je Tabelle ein Byte pro Index ((Seite am Zug * 36 + weißer König) * 36
+# + schwarzer König) * 36 + Feld der Figur, immer mit Weiß als stärkerer Seite;
+# mit Schwarz als stärkerer Seite wird an der Mittellinie gespiegelt.
+# Wert aus Sicht der Seite am Zug: 0 Remis, d > 0 Sieg in d Halbzügen,
+# -(d + 1) Verlust in d Halbzügen, TB_INVALID unmögliche Stellung.
+# Gebaut mit schach_endspiel.py; Stellungen mit möglicher Rochade fragt die Suche
+# nicht ab.
+TB_MAGIC = b"SB6T"
+TB_VERSION = 1
+TB_TABLES = {"KQK": QUEEN, "KRK": ROOK, "KPK": PAWN}
+TB_SIZE = 2 * NUM_SQUARES**3
+TB_INVALID = -128
+_TB_HEADER = struct.Struct("<4sHH")
+_TB_TABLE_ENTRY = struct.Struct("<4sII")
+
+
+def tb_index(side, white_king, black_king, piece_sq):
+    index = (side * NUM_SQUARES + white_king) * NUM_SQUARES + black_king
+    return index * NUM_SQUARES + piece_sq
+
+
+def mirror_square(sq):
+    r, c = square_coords(sq)
+    return square_index(BOARD_SIZE - 1 - r, c)
+
+
+def tb_score(value):
+    # Tabellenwert als Score aus Sicht der Seite am Zug, None für unmöglich
+    if value == TB_INVALID:
+        return None
+    if value > 0:
+        return CHECKMATE_SCORE - value
+    if value < 0:
+        return -(CHECKMATE_SCORE + value + 1)
+    return DRAW_SCORE
+
+
+def tb_lookup_index(pos):
+    # (Tabellenname, Index) für eine passende Stellung, sonst None
+    occupied = pos.occupied_by[WHITE] | pos.occupied_by[BLACK]
+    if occupied.bit_count() != 3:
+        return None
+    # Die Tabellen kennen keine Rochade; Rechte ohne König und Turm auf ihren
+    # Ausgangsfeldern sind bedeutungslos
+    for bit, color, king_from, _, rook_from, _, _, _, _ in pos.variant.castles:
+        if (
+            pos.castling & bit
+            and pos.squares[king_from] == piece_code(color, KING)
+            and pos.squares[rook_from] == piece_code(color, ROOK)
+        ):
+            return None
+    white_king = pos.king_square(WHITE)
+    black_king = pos.king_square(BLACK)
+    if white_king is None or black_king is None:
+        return None
+    for name, ptype in TB_TABLES.items():
+        if pos.pieces[WHITE * 6 + ptype]:
+            piece_sq = pos.pieces[WHITE * 6 + ptype].bit_length() - 1
+            return name, tb_index(pos.side, white_king, black_king, piece_sq)
+        if pos.pieces[BLACK * 6 + ptype]:
+            piece_sq = pos.pieces[BLACK * 6 + ptype].bit_length() - 1
+            return name, tb_index(
+                1 - pos.side,
+                mirror_square(black_king),
+                mirror_square(white_king),
+                mirror_square(piece_sq),
+            )
+    return None
+
+
+class Tablebase:
+    # Liest die Tabellen per mmap; es wird nur gelesen, was die Suche abfragt
+    def __init__(self, path):
+        self.path = path
+        self.tables = {}  # Name -> (Offset, Länge)
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count = _TB_HEADER.unpack_from(self._data)
+            if magic != TB_MAGIC or version != TB_VERSION:
+                raise ValueError(
+                    f"Keine Endspieldatenbank (Version {TB_VERSION}): {path}"
+                )
+            for i in range(count):
+                name, offset, length = _TB_TABLE_ENTRY.unpack_from(
+                    self._data, _TB_HEADER.size + i * _TB_TABLE_ENTRY.size
+                )
+                if offset + length > len(self._data):
+                    raise ValueError(f"Endspieldatenbank unvollständig: {path}")
+                self.tables[name.rstrip(b"\0").decode()] = (offset, length)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if getattr(self, "_data", None) is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+
+    def probe_value(self, pos):
+        lookup = tb_lookup_index(pos)
+        if lookup is None or lookup[0] not in self.tables:
+            return None
+        offset, _ = self.tables[lookup[0]]
+        value = self._data[offset + lookup[1]]
+        return value - 256 if value > 127 else value
+
+    def probe(self, pos):
+        # Score aus Sicht der Seite am Zug oder None, wenn keine Tabelle passt
+        value = self.probe_value(pos)
+        if value is None:
+            return None
+        return tb_score(value)
+
+    def best_move(self, pos):
+        # Schnellster Gewinn, langsamster Verlust, sonst ein Remiszug
+        if self.probe_value(pos) is None:
+            return None
+        best_move, best_score = None, None
+        for move in pos.generate_legal_moves():
+            pos.make_move(move)
+            if not pos.generate_legal_moves():
+                score = CHECKMATE_SCORE if pos.in_check() else DRAW_SCORE
+            else:
+                child = self.probe(pos)
+                # Nach dem Schlagen der letzten Figur bleibt König gegen König
+                score = -child if child is not None else DRAW_SCORE
+                if score > DRAW_SCORE:
+                    score -= 1
+                elif score < DRAW_SCORE:
+                    score += 1
+            pos.unmake_move()
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+        return best_move
+
+
+# --- Parallele Wurzelsuche über mehrere Prozesse ---
+# Die Wurzelzüge werden auf einen ProcessPoolExecutor verteilt. Alle Prozesse
+# teilen sich das aktuelle alpha der Wurzel, einen Knotenzähler und ein Stopp-Signal;
+# jeder Prozess behält seine eigene Transpositionstabelle über die Aufgaben hinweg.
+# Die Schlüsselwortargumente für Search gehen mit jeder Aufgabe mit; eine
+# Endspieldatenbank reist als Dateipfad und wird je Prozess einmal eingeblendet.
+_worker_state = {}
+
+
+def _parallel_worker_init(shared_alpha, shared_nodes, stop_event, tt_entries):
+    _worker_state["alpha"] = shared_alpha
+    _worker_state["nodes"] = shared_nodes
+    _worker_state["stop_event"] = stop_event
+    _worker_state["tt"] = TranspositionTable(tt_entries)
+
+
+def _worker_tablebase(path):
+    tablebases = _worker_state.setdefault("tablebases", {})
+    if path not in tablebases:
+        tablebases[path] = Tablebase(path)
+    return tablebases[path]
+
+
+def _parallel_search_root_move(pos, move, depth, deadline, node_limit, options):
+    # Sucht einen Wurzelzug im Arbeitsprozess; deadline ist eine time.time()-Zeit,
+    # weil perf_counter zwischen Prozessen nicht vergleichbar ist.
+    # Ergebnis: (Zug, Score oder None bei Abbruch, Knoten)
+    tt = _worker_state["tt"]
+    tt.new_search()
+    options = dict(options)
+    if options.get("tablebase") is not None:
+        options["tablebase"] = _worker_tablebase(options["tablebase"])
+    search = Search(pos.side, tt, stop_event=_worker_state["stop_event"], **options)
+    search.shared_nodes = _worker_state["nodes"]
+    search.node_limit = node_limit
+    if deadline is not None:
+        search.deadline = time.perf_counter() + (deadline - time.time())
+    shared_alpha = _worker_state["alpha"]
+    # Ein Punkt unter dem geteilten alpha, damit ein gleich guter Zug einen exakten
+    # Score liefert und nicht nur eine obere Schranke
+    alpha = shared_alpha.value - 1
+    pos.make_move(move)
+    try:
+        if search.pvs:
+            score = -search.negamax(pos, depth - 1, -float("inf"), -alpha, 1)[0]
+        else:
+            score, _ = search.minimax(pos, depth - 1, alpha, float("inf"), False, 1)
+    except SearchTimeout:
+        return move, None, search.nodes + search.qnodes
+    with shared_alpha.get_lock():
+        if score > shared_alpha.value:
+            shared_alpha.value = score
+    return move, score, search.nodes + search.qnodes
+
+
+class ParallelSearch:
+    POLL_INTERVAL = 0.05  # Sekunden zwischen zwei Blicken auf ein externes Stopp-Signal
+
+    def __init__(self, workers, tt_entries=1 << 16):
+        context = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self.shared_alpha = context.Value("d", -float("inf"))
+        self.shared_nodes = context.Value("q", 0)
+        self.stop_event = context.Event()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_parallel_worker_init,
+            initargs=(
+                self.shared_alpha,
+                self.shared_nodes,
+                self.stop_event,
+                tt_entries,
+            ),
+        )
+        self.nodes = 0
+        self.current_depth = 0
+        self.iterations = []  # (Tiefe, Score, bester Zug, Sekunden, Knoten bisher)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def _search_depth(self, pos, moves, depth, deadline, node_limit, options, stop):
+        self.shared_alpha.value = -float("inf")
+        self.stop_event.clear()
+        futures = [
+            self.executor.submit(
+                _parallel_search_root_move,
+                pos,
+                move,
+                depth,
+                deadline,
+                node_limit,
+                options,
+            )
+            for move in moves
+        ]
+        results = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(
+                pending, timeout=self.POLL_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                results.append(future.result())
+            if stop is not None and stop.is_set():
+                self.stop_event.set()
+        scores = {}
+        for move, score, nodes in results:
+            self.nodes += nodes
+            if score is not None:
+                scores[move] = score
+        if len(scores) < len(moves):
+            return None  # Iteration unvollständig
+        return scores
+
+    def search(
+        self,
+        pos,
+        max_depth,
+        time_budget_ms=None,
+        node_limit=None,
+        stop=None,
+        **search_options,
+    ):
+        # Iterative Vertiefung; jede Tiefe verteilt die Wurzelzüge auf die Prozesse,
+        # sortiert nach den Scores der vorherigen Tiefe. stop ist ein optionales
+        # threading.Event des Aufrufers (z.B. der GUI); search_options sind die
+        # Schlüsselwortargumente für Search in den Arbeitsprozessen.
+        if search_options.get("tablebase") is not None:
+            search_options["tablebase"] = search_options["tablebase"].path
+        start_time = time.perf_counter()
+        deadline = time.time() + time_budget_ms / 1000.0 if time_budget_ms else None
+        self.nodes = 0
+        self.shared_nodes.value = 0
+        self.iterations = []
+        moves = pos.generate_legal_moves()
+        if not moves:
+            return None, None
+        moves = Search(pos.side).order_moves(pos, moves, None, 0)
+        best_score, best_move = None, None
+        for depth in range(1, max_depth + 1):
+            # Wie bei iterative_deepening läuft die erste Tiefe immer zu Ende
+            self.current_depth = depth
+            scores = self._search_depth(
+                pos,
+                moves,
+                depth,
+                deadline if depth > 1 else None,
+                node_limit if depth > 1 else None,
+                search_options,
+                stop,
+            )
+            if scores is None:
+                break
+            # Stabil sortieren: gleich bewertete Züge behalten ihre Reihenfolge
+            moves.sort(key=lambda move: -scores[move])
+            best_move = moves[0]
+            best_score = scores[best_move]
+            self.iterations.append(
+                (
+                    depth,
+                    best_score,
+                    best_move,
+                    time.perf_counter() - start_time,
+                    self.nodes,
+                )
+            )
+            if abs(best_score) >= CHECKMATE_SCORE or (
+                stop is not None and stop.is_set()
+            ):
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+        return best_score, best_move
@@ -0,0 +1,278 @@
+# --- Selbstspiel-Turnier zweier Suchvarianten mit SPRT-Abbruch ---
+#
+#   python schach_turnier.py --base pvs --test selektiv --nodes 20000
+#   python schach_turnier.py --variant grok_schach --movetime 200 --games 4000 \
+#       --elo0 0 --elo1 10 --output lauf.jsonl
+#
+# Jede Eröffnung (zufällige Halbzüge aus einem Startwert je Partiepaar) wird
+# zweimal gespielt, einmal mit jeder Farbe. Die Partien laufen in einem
+# Prozesspool; jedes Ergebnis wird sofort als JSON-Zeile geschrieben, Fortschritt
+# und Zusammenfassung gehen nach stderr. Der sequentielle
+# Wahrscheinlichkeitsquotiententest (SPRT) bricht ab, sobald feststeht, ob die
+# Testvariante elo1 stärker ist oder höchstens elo0.
+import argparse
+import concurrent.futures
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import schach_bench
+import schach_engine
+
+VARIANTS = schach_bench.VARIANTS
+SEARCH_MODES = schach_bench.SEARCH_MODES
+
+MAX_DEPTH = 64
+RESULT_SCORES = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}  # aus Sicht von Weiß
+
+
+# --- Eine Partie ---
+def random_opening(variant, seed, plies):
+    # Zufällige legale Halbzüge; Stellungen ohne Züge werden neu ausgelost
+    rng = random.Random(seed)
+    while True:
+        pos = variant.initial_position()
+        moves = []
+        for _ in range(plies):
+            legal_moves = pos.generate_legal_moves()
+            if not legal_moves:
+                break
+            move = rng.choice(legal_moves)
+            pos.make_move(move)
+            moves.append(move)
+        if len(moves) == plies and pos.generate_legal_moves():
+            return moves
+
+
+def choose_move(pos, tt, mode, nodes, movetime_ms, depth):
+    tt.new_search()
+    search = schach_engine.Search(pos.side, tt, **SEARCH_MODES[mode])
+    search.node_limit = nodes
+    _, move = search.iterative_deepening(pos, depth or MAX_DEPTH, movetime_ms)
+    if move is None:  # Limit schon in der ersten Tiefe erreicht
+        move = pos.generate_legal_moves()[0]
+    return move, search.nodes + search.qnodes
+
+
+def play_game(game):
+    # Spielt eine Partie im Arbeitsprozess; game ist ein dict aus schedule_games
+    variant = VARIANTS[game["variant"]]
+    opening = random_opening(variant, game["seed"], game["opening_plies"])
+    pos = variant.initial_position()
+    for move in opening:
+        pos.make_move(move)
+    players = {schach_engine.WHITE: game["white"], schach_engine.BLACK: game["black"]}
+    tables = {
+        color: schach_engine.TranspositionTable(game["tt_entries"]) for color in players
+    }
+    nodes = {mode: 0 for mode in players.values()}
+    start = time.perf_counter()
+    result, reason = "1/2-1/2", "maximale Länge"
+    for _ in range(game["max_plies"]):
+        legal_moves = pos.generate_legal_moves()
+        if not legal_moves:
+            if pos.in_check():
+                result = "0-1" if pos.side == schach_engine.WHITE else "1-0"
+                reason = "Matt"
+            else:
+                reason = "Patt"
+            break
+        if pos.is_draw_by_rule(3):
+            reason = "Remisregel"
+            break
+        mode = players[pos.side]
+        move, move_nodes = choose_move(
+            pos,
+            tables[pos.side],
+            mode,
+            game["nodes"],
+            game["movetime"],
+            game["depth"],
+        )
+        nodes[mode] += move_nodes
+        pos.make_move(move)
+    test_is_white = game["white"] == game["test"]
+    white_score = RESULT_SCORES[result]
+    return {
+        "game": game["index"],
+        "seed": game["seed"],
+        "variant": game["variant"],
+        "opening": [schach_engine.move_to_text(move) for move in opening],
+        "white": game["white"],
+        "black": game["black"],
+        "result": result,
+        "reason": reason,
+        "plies": len(pos.undo_stack) - len(opening),
+        "test_score": white_score if test_is_white else 1.0 - white_score,
+        "nodes": nodes,
+        "seconds": round(time.perf_counter() - start, 3),
+        "final_fen": schach_engine.position_to_fen(pos),
+    }
+
+
+def schedule_games(args):
+    # Partiepaare mit gleicher Eröffnung und vertauschten Farben
+    master = random.Random(args.seed)
+    for pair in range(math.ceil(args.games / 2)):
+        seed = master.getrandbits(32)
+        for swap in (False, True):
+            index = 2 * pair + swap
+            if index >= args.games:
+                return
+            yield {
+                "index": index,
+                "seed": seed,
+                "variant": args.variant,
+                "opening_plies": args.opening_plies,
+                "white": args.base if swap else args.test,
+                "black": args.test if swap else args.base,
+                "test": args.test,
+                "nodes": args.nodes,
+                "movetime": args.movetime,
+                "depth": args.depth,
+                "max_plies": args.max_plies,
+                "tt_entries": args.tt_entries,
+            }
+
+
+# --- SPRT ---
+def elo_to_score(elo):
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def score_to_elo(score):
+    score = min(max(score, 1e-3), 1.0 - 1e-3)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    # Log-Likelihood-Quotient (GSPRT-Näherung über Mittelwert und Varianz der
+    # Partiepunkte) für H1: elo1 gegen H0: elo0
+    games = wins + draws + losses
+    if not games or not wins + losses:
+        return 0.0
+    score = (wins + 0.5 * draws) / games
+    variance = (
+        wins * (1.0 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score**2
+    ) / games
+    if variance <= 0:
+        return 0.0
+    score0, score1 = elo_to_score(elo0), elo_to_score(elo1)
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1.0 - alpha)), math.log((1.0 - beta) / alpha)
+
+
+# --- Turnier ---
+def run_match(args, output):
+    lower, upper = sprt_bounds(args.alpha, args.beta)
+    wins = draws = losses = 0
+    decision = None
+    games = schedule_games(args)
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(args.workers) as pool:
+        pending = set()
+        while True:
+            # Nur wenige Partien im Voraus vergeben, damit der SPRT schnell stoppt
+            while decision is None and len(pending) < 2 * args.workers:
+                game = next(games, None)
+                if game is None:
+                    break
+                pending.add(pool.submit(play_game, game))
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                record = future.result()
+                wins += record["test_score"] == 1.0
+                draws += record["test_score"] == 0.5
+                losses += record["test_score"] == 0.0
+                llr = sprt_llr(wins, draws, losses, args.elo0, args.elo1)
+                record["llr"] = round(llr, 4)
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                if decision is None and llr >= upper:
+                    decision = "H1"
+                elif decision is None and llr <= lower:
+                    decision = "H0"
+            if decision is not None:
+                for future in pending:
+                    future.cancel()
+                pending = {future for future in pending if not future.cancelled()}
+            games_played = wins + draws + losses
+            print(
+                f"\r{games_played} Partien: +{wins} ={draws} -{losses}, "
+                f"LLR {llr:.2f} [{lower:.2f}, {upper:.2f}] "
+                f"[{time.perf_counter() - start:.0f}s]",
+                end="",
+                file=sys.stderr,
+                flush=True,
+            )
+    print(file=sys.stderr)
+    return wins, draws, losses, decision
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Selbstspiel-Turnier zweier Suchvarianten mit SPRT-Abbruch"
+    )
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="daschach")
+    parser.add_argument(
+        "--base", default="pvs", help="Referenz: " + ", ".join(SEARCH_MODES)
+    )
+    parser.add_argument("--test", default="selektiv", help="zu prüfende Suchvariante")
+    parser.add_argument("-n", "--games", type=int, default=2000, help="höchstens")
+    parser.add_argument("--nodes", type=int, help="Knoten je Zug")
+    parser.add_argument("--movetime", type=int, help="Millisekunden je Zug")
+    parser.add_argument("-d", "--depth", type=int, help="feste Suchtiefe je Zug")
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--tt-entries", type=int, default=1 << 16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=10.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("-o", "--output", help="JSONL-Datei (Standard: stdout)")
+    args = parser.parse_args(argv)
+    for mode in (args.base, args.test):
+        if mode not in SEARCH_MODES:
+            parser.error(f"Unbekannte Suchvariante: {mode}")
+    if args.nodes is None and args.movetime is None and args.depth is None:
+        args.nodes = 10000
+
+    print(
+        f"{args.variant}: {args.test} gegen {args.base}, höchstens {args.games} "
+        f"Partien, {args.workers} Prozesse, SPRT elo0={args.elo0} elo1={args.elo1}",
+        file=sys.stderr,
+    )
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as output:
+            wins, draws, losses, decision = run_match(args, output)
+    else:
+        wins, draws, losses, decision = run_match(args, sys.stdout)
+    games = wins + draws + losses
+    if games:
+        elo = score_to_elo((wins + 0.5 * draws) / games)
+        verdict = {
+            "H1": f"{args.test} ist stärker",
+            "H0": f"{args.test} ist nicht stärker",
+            None: "keine Entscheidung",
+        }[decision]
+        print(
+            f"{games} Partien, +{wins} ={draws} -{losses}, Elo {elo:+.1f}: {verdict}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# --- Textprotokoll nach Art von UCI für die 6x6-Engine (stdin/stdout) ---
+#
+#   python schach_uci.py                      # Variante daschach
+#   python schach_uci.py --variant grok_schach
+#
+# Befehle (eine Zeile je Befehl):
+#   uci | isready | ucinewgame | quit
+#   setoption name Variant value grok_schach      (auch OwnBook, Tablebase)
+#   position startpos [moves a2a3 b5b4 ...]
+#   position fen <FEN> [moves ...]
+#   go [depth N] [movetime MS] [nodes N] [wtime MS btime MS winc MS binc MS
+#      movestogo N] [infinite]
+#   stop
+# Während der Suche kommt je fertiger Tiefe eine Zeile
+#   info depth D score cp X nodes N nps R time MS pv ...
+# und am Ende "bestmove <Zug>". Züge in Koordinatenschreibweise (a1 unten links,
+# Umwandlung mit angehängtem Buchstaben, z.B. b5b6q).
+import argparse
+import sys
+import threading
+
+import daschach
+import grok_schach
+import schach_engine
+
+VARIANTS = {
+    "daschach": daschach,
+    "grok_schach": grok_schach,
+}
+
+ENGINE_NAME = "Schach6x6"
+CENTIPAWNS_PER_POINT = 10  # ein Bauer ist 10 Punkte, UCI rechnet in Hundertsteln
+MATE_THRESHOLD = schach_engine.CHECKMATE_SCORE - 200  # darüber: Matt melden
+MAX_DEPTH = 64
+# Ohne movestogo wird die Restzeit auf so viele Züge verteilt
+DEFAULT_MOVES_TO_GO = 30
+MOVE_OVERHEAD_MS = 50  # Reserve für Ein-/Ausgabe je Zug
+
+
+def format_score(score, pv):
+    # Matt in n Zügen (aus der Länge der Hauptvariante) oder Hundertstelbauern
+    if abs(score) >= MATE_THRESHOLD:
+        moves = max(1, (len(pv) + 1) // 2)
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score * CENTIPAWNS_PER_POINT}"
+
+
+def time_budget_from_clock(limits, side):
+    # Bedenkzeit für diesen Zug aus der Restzeit der Seite am Zug
+    remaining = limits.get("wtime" if side == schach_engine.WHITE else "btime")
+    if remaining is None:
+        return None
+    increment = limits.get("winc" if side == schach_engine.WHITE else "binc", 0)
+    moves_to_go = limits.get("movestogo") or DEFAULT_MOVES_TO_GO
+    budget = remaining // moves_to_go + increment // 2
+    return max(1, min(budget, remaining - MOVE_OVERHEAD_MS))
+
+
+class UciEngine:
+    def __init__(self, variant_name="daschach", output=None):
+        self.output = output or sys.stdout
+        self.output_lock = threading.Lock()
+        self.own_book = True
+        self.use_tablebase = True
+        self.search_thread = None
+        self.stop_event = threading.Event()
+        self.set_variant(variant_name)
+
+    def send(self, line):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def set_variant(self, variant_name):
+        self.module = VARIANTS[variant_name]
+        self.variant_name = variant_name
+        self.tt = schach_engine.TranspositionTable(
+            self.module.AI_TT_ENTRIES, self.module.AI_TT_REPLACEMENT
+        )
+        self.position = self.module.VARIANT.initial_position()
+
+    # --- Befehle ---
+    def handle(self, line):
+        # Liefert False, sobald die Engine beendet werden soll
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "quit":
+            self.stop()
+            return False
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME} ({self.variant_name})")
+            self.send(
+                "option name Variant type combo default daschach "
+                + " ".join(f"var {name}" for name in sorted(VARIANTS))
+            )
+            self.send("option name OwnBook type check default true")
+            self.send("option name Tablebase type check default true")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.wait()
+            self.set_variant(self.variant_name)
+        elif command == "setoption":
+            self.wait()
+            self.set_option(args)
+        elif command == "position":
+            self.wait()
+            self.set_position(args)
+        elif command == "go":
+            self.wait()
+            self.go(args)
+        elif command == "stop":
+            self.stop()
+        elif command == "d":
+            self.send(f"info string fen {schach_engine.position_to_fen(self.position)}")
+        else:
+            self.send(f"info string Unbekannter Befehl: {command}")
+        return True
+
+    def set_option(self, args):
+        if "name" not in args:
+            return
+        value_index = args.index("value") if "value" in args else len(args)
+        name = " ".join(args[args.index("name") + 1 : value_index]).lower()
+        value = " ".join(args[value_index + 1 :])
+        if name == "variant":
+            if value not in VARIANTS:
+                self.send(f"info string Unbekannte Variante: {value}")
+                return
+            self.set_variant(value)
+        elif name == "ownbook":
+            self.own_book = value.lower() == "true"
+        elif name == "tablebase":
+            self.use_tablebase = value.lower() == "true"
+        else:
+            self.send(f"info string Unbekannte Option: {name}")
+
+    def set_position(self, args):
+        moves_index = args.index("moves") if "moves" in args else len(args)
+        try:
+            if args and args[0] == "startpos":
+                position = self.module.VARIANT.initial_position()
+            elif args and args[0] == "fen":
+                fen_fields = args[1:moves_index]
+                position = schach_engine.position_from_fen(
+                    self.module.VARIANT, " ".join(fen_fields)
+                )
+                if len(fen_fields) > 4 and fen_fields[4].isdigit():
+                    position.halfmove_clock = int(fen_fields[4])
+            else:
+                self.send("info string position braucht startpos oder fen")
+                return
+        except ValueError as error:
+            self.send(f"info string {error}")
+            return
+        for text in args[moves_index + 1 :]:
+            move = schach_engine.text_to_move(position, text)
+            if move is None:
+                self.send(f"info string Illegaler Zug: {text}")
+                return
+            position.make_move(move)
+        self.position = position
+
+    def go(self, args):
+        limits = {}
+        index = 0
+        while index < len(args):
+            name = args[index]
+            if name == "infinite":
+                limits["infinite"] = True
+                index += 1
+                continue
+            if index + 1 < len(args) and args[index + 1].lstrip("-").isdigit():
+                limits[name] = int(args[index + 1])
+                index += 2
+            else:
+                index += 1
+        self.stop_event = threading.Event()
+        self.search_thread = threading.Thread(
+            target=self.search, args=(self.position.copy(), limits), daemon=True
+        )
+        self.search_thread.start()
+
+    def wait(self):
+        # Neue Befehle warten, bis die laufende Suche ihren bestmove gemeldet hat
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def stop(self):
+        self.stop_event.set()
+        self.wait()
+
+    # --- Suche ---
+    def send_info(self, search, depth, score, pv, seconds):
+        nodes = search.nodes + search.qnodes
+        nps = int(nodes / seconds) if seconds > 0 else 0
+        self.send(
+            f"info depth {depth} score {format_score(score, pv)} nodes {nodes} "
+            f"nps {nps} time {int(seconds * 1000)} "
+            f"pv {' '.join(schach_engine.move_to_text(move) for move in pv)}"
+        )
+
+    def search(self, position, limits):
+        legal_moves = position.generate_legal_moves()
+        if not legal_moves:
+            self.send("bestmove 0000")
+            return
+        if not limits.get("infinite"):
+            direct_move = None
+            if self.own_book:
+                direct_move = self.module.get_opening_book().probe(position)
+            tablebase = self.module.get_tablebase() if self.use_tablebase else None
+            if direct_move is None and tablebase is not None:
+                direct_move = tablebase.best_move(position)
+            if direct_move is not None:
+                self.send(f"bestmove {schach_engine.move_to_text(direct_move)}")
+                return
+        self.tt.new_search()
+        # Gleiche Suchoptionen wie die GUI, nur die Tablebase ist abschaltbar
+        options = self.module.ai_search_options()
+        if not self.use_tablebase:
+            options["tablebase"] = None
+        search = schach_engine.Search(
+            position.side, self.tt, stop_event=self.stop_event, **options
+        )
+        search.on_iteration = self.send_info
+        search.node_limit = limits.get("nodes")
+        time_budget_ms = limits.get("movetime") or time_budget_from_clock(
+            limits, position.side
+        )
+        _, best_move = search.iterative_deepening(
+            position, limits.get("depth", MAX_DEPTH), time_budget_ms
+        )
+        if limits.get("infinite"):
+            # UCI: bei "go infinite" erst nach "stop" antworten
+            self.stop_event.wait()
+        if best_move is None:
+            best_move = legal_moves[0]  # schon in der ersten Tiefe gestoppt
+        self.send(f"bestmove {schach_engine.move_to_text(best_move)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="6x6-Schach-Engine über ein UCI-artiges Textprotokoll"
+    )
+    parser.add_argument("--variant", choices=sorted(VARIANTS), default="daschach")
+    args = parser.parse_args(argv)
+    engine = UciEngine(args.variant)
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())